@@ -1,37 +1,47 @@
+import mmap
 import os
 import re
 import subprocess
+import sys
+
+# Patrones precompilados (en bytes: permiten escanear el mmap sin decodificar)
+APPROVED_RE = re.compile(rb",\s*approved\s*=\s*[^,)]+")
+IOCOMP_RE = re.compile(rb"\bIOComponent\b")
+
+def patch_file(path, pattern, repl, descripcion):
+    """Aplica un parche regex solo si el archivo realmente lo necesita."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            # Escaneo barato sobre el mmap: si no hay match, no reescribimos nada
+            if pattern.search(mm) is None:
+                print(f"✅ {path} ya estaba corregido ({descripcion})")
+                return
+            content = mm[:]
+        finally:
+            mm.close()
+
+    fixed_content = pattern.sub(repl, content)
+    with open(path, "wb") as f:
+        f.write(fixed_content)
+    print(f"✅ {path} corregido ({descripcion})")
 
 # ---------- 1️⃣ Actualizar dependencias ----------
+# Una sola invocación: el resolver de pip planifica todo junto, y
+# sys.executable evita ambigüedad de PATH entre entornos
 print("🔹 Actualizando Gradio y einops...")
-subprocess.run(["pip", "install", "--upgrade", "gradio==4.44.1"], check=True)
-subprocess.run(["pip", "install", "einops==0.8.0"], check=True)
+subprocess.run([sys.executable, "-m", "pip", "install", "--no-input", "--upgrade",
+                "gradio==4.44.1", "einops==0.8.0"], check=True)
 
 # ---------- 2️⃣ Arreglar webui.py ----------
-webui_path = "./webui.py"
-if os.path.exists(webui_path):
-    with open(webui_path, "r", encoding="utf-8") as f:
-        content = f.read()
-    
-    # Elimina cualquier argumento 'approved=...'
-    fixed_content = re.sub(r",\s*approved\s*=\s*[^,)]+", "", content)
-    
-    with open(webui_path, "w", encoding="utf-8") as f:
-        f.write(fixed_content)
-    print(f"✅ webui.py corregido (removed 'approved')")
+# Elimina cualquier argumento 'approved=...'
+patch_file("./webui.py", APPROVED_RE, b"", "removed 'approved'")
 
 # ---------- 3️⃣ Arreglar gradio_hijack.py ----------
-grh_path = "./modules/gradio_hijack.py"
-if os.path.exists(grh_path):
-    with open(grh_path, "r", encoding="utf-8") as f:
-        content = f.read()
-    
-    # Reemplaza IOComponent por Component
-    fixed_content = re.sub(r"\bIOComponent\b", "Component", content)
-    
-    with open(grh_path, "w", encoding="utf-8") as f:
-        f.write(fixed_content)
-    print(f"✅ gradio_hijack.py corregido (IOComponent -> Component)")
+# Reemplaza IOComponent por Component
+patch_file("./modules/gradio_hijack.py", IOCOMP_RE, b"Component", "IOComponent -> Component")
 
 print("🎯 Reparaciones completadas. Ahora ejecuta:")
 print("python entry_with_update.py --share --always-high-vram --disable-offload --theme dark")
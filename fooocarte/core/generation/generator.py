@@ -1,4 +1,4 @@
-from PIL import Image
+import os
 from ..state.state_enum import GlobalState
 
 def generate_once(engine, all_steps, async_task, callback, controlnet_canny_path, controlnet_cpds_path, current_task_id,
@@ -29,9 +29,10 @@ def generate_once(engine, all_steps, async_task, callback, controlnet_canny_path
     if engine.clip_threshold > 0:
         engine.init_quality_filter()
         if engine.quality_filter:
-            # Convert first image to PIL for CLIP
-            pil_img = Image.fromarray(imgs[0])
-            score = engine.quality_filter.score(pil_img, async_task.prompt)
+            # Score the whole task output in one CLIP forward pass (text encoded once);
+            # raw numpy arrays go straight to the GPU preprocessor, no PIL copy
+            scores = engine.quality_filter.score_batch(list(imgs), async_task.prompt)
+            score = scores[0]
             print(f"[FooocArte] CLIP Quality Score: {score:.4f} (Threshold: {engine.clip_threshold})")
             if score < engine.clip_threshold:
                 is_valid = False
@@ -1,15 +1,98 @@
+import atexit
+import queue
+import threading
+import time
 from datetime import datetime
 
 class TechnicalLogger:
-    """Handles professional generation logging (log.txt)."""
+    """Handles professional generation logging (log.txt).
+
+    Entries go onto an in-memory queue and a daemon thread drains them to a
+    buffered file handle, so a slow Drive/SMB mount never stalls the
+    generation thread.
+    """
+
+    # Flush the file buffer after this many records or this much idle time
+    _FLUSH_EVERY = 32
+    _FLUSH_INTERVAL = 0.05
+
     def __init__(self, path: str):
         self.path = path
+        self._lock = threading.Lock()
+        self._fh = None
+        self._q = queue.Queue(maxsize=50000)
+        self._stop = threading.Event()
+        try:
+            # One persistent 64 KB-buffered handle instead of open/write/close per entry
+            self._fh = open(path, "a", encoding="utf-8", buffering=1 << 16)
+            self._worker = threading.Thread(target=self._drain, daemon=True)
+            self._worker.start()
+            atexit.register(self.close)
+        except Exception as e:
+            print(f"[FooocArte] Logging error: {e}")
 
     def log(self, status: str, prompt: str, result: str):
+        if self._fh is None:
+            return
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        entry = f"[{timestamp}] [{status}] PROMPT: \"{prompt[:100]}...\" | RESULT: {result}\n"
+        record = (timestamp, status, prompt[:100], result)
         try:
-            with open(self.path, "a", encoding="utf-8") as f:
-                f.write(entry)
+            self._q.put_nowait(record)
+        except queue.Full:
+            # Backpressure: give the drain thread a beat, then drop if still full
+            try:
+                self._q.put(record, block=True, timeout=0.1)
+            except queue.Full:
+                print("[FooocArte] Logging queue full, entry dropped")
+
+    def _drain(self):
+        pending = 0
+        while not self._stop.is_set() or not self._q.empty():
+            try:
+                timestamp, status, prompt, result = self._q.get(timeout=self._FLUSH_INTERVAL)
+            except queue.Empty:
+                if pending:
+                    self._flush_fh()
+                    pending = 0
+                continue
+            entry = f"[{timestamp}] [{status}] PROMPT: \"{prompt}...\" | RESULT: {result}\n"
+            try:
+                with self._lock:
+                    self._fh.write(entry)
+            except Exception as e:
+                print(f"[FooocArte] Logging error: {e}")
+            pending += 1
+            if pending >= self._FLUSH_EVERY:
+                self._flush_fh()
+                pending = 0
+
+    def _flush_fh(self):
+        try:
+            with self._lock:
+                self._fh.flush()
         except Exception as e:
             print(f"[FooocArte] Logging error: {e}")
+
+    def flush(self):
+        """Drain queued entries to disk; called by the engine on terminal states."""
+        if self._fh is None:
+            return
+        # Wait for the queue to empty, then force the OS-level flush
+        while not self._q.empty() and not self._stop.is_set():
+            time.sleep(0.01)
+        self._flush_fh()
+
+    def close(self):
+        if self._fh is None:
+            return
+        self._stop.set()
+        try:
+            self._worker.join(timeout=2.0)
+        except Exception:
+            pass
+        try:
+            with self._lock:
+                self._fh.flush()
+                self._fh.close()
+        finally:
+            self._fh = None
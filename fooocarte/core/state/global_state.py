@@ -1,5 +1,6 @@
 import threading
-from typing import Optional, Dict, Any
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Mapping
 from .state_enum import GlobalState
 
 class GlobalStateMachine:
@@ -7,6 +8,7 @@ class GlobalStateMachine:
         self._state = GlobalState.IDLE
         self._lock = threading.RLock()
         self._metadata = {}
+        self._meta_view = MappingProxyType(self._metadata)
         
         # Batch Counters (Fase 15)
         self._batch_current = 0
@@ -14,6 +16,17 @@ class GlobalStateMachine:
         self._valid_images = 0
         self._mode = "SINGLE" # SINGLE | BATCH
         self._paused = False
+        self._publish()
+
+    def _publish(self):
+        """Publish an immutable snapshot for lock-free readers.
+
+        A single attribute assignment is atomic under the GIL, so readers
+        never see a torn state and never touch the RLock. Mutators call this
+        at the end of their critical section.
+        """
+        self._snapshot = (self._state, self._batch_current, self._batch_total,
+                          self._valid_images, self._mode, self._paused)
 
     def reset(self):
         with self._lock:
@@ -22,47 +35,56 @@ class GlobalStateMachine:
             self._batch_total = 0
             self._valid_images = 0
             self._metadata = {}
+            self._meta_view = MappingProxyType(self._metadata)
             self._paused = False
+            self._publish()
             print("[FooocArte] State Machine RESET to IDLE")
 
     @property
     def state(self) -> GlobalState:
-        with self._lock:
-            return self._state
+        return self._snapshot[0]
 
     @property
-    def metadata(self) -> Dict[str, Any]:
-        with self._lock:
-            return self._metadata.copy()
+    def metadata(self) -> Mapping[str, Any]:
+        # Read-only zero-copy view; callers that need a mutable dict can
+        # wrap it in dict(...) explicitly (none currently do)
+        return self._meta_view
 
     @property
     def batch_status(self) -> Dict[str, Any]:
-        with self._lock:
-            return {
-                "current": self._batch_current,
-                "total": self._batch_total,
-                "valid": self._valid_images,
-                "mode": self._mode,
-                "state": self._state.value,
-                "paused": self._paused
-            }
+        state, current, total, valid, mode, paused = self._snapshot
+        return {
+            "current": current,
+            "total": total,
+            "valid": valid,
+            "mode": mode,
+            "state": state.value,
+            "paused": paused
+        }
 
     @property
     def batch_current(self) -> int:
-        return self._batch_current
+        return self._snapshot[1]
+
+    @batch_current.setter
+    def batch_current(self, value: int):
+        with self._lock:
+            self._batch_current = value
+            self._publish()
 
     @property
     def batch_total(self) -> int:
-        return self._batch_total
+        return self._snapshot[2]
 
     @batch_total.setter
     def batch_total(self, value: int):
         with self._lock:
             self._batch_total = value
+            self._publish()
 
     @property
     def valid_images(self) -> int:
-        return self._valid_images
+        return self._snapshot[3]
 
     def can_start(self) -> bool:
         return self.state in [GlobalState.IDLE, GlobalState.COMPLETADO, GlobalState.ERROR]
@@ -86,6 +108,7 @@ class GlobalStateMachine:
             self._batch_current += 1
             if success:
                 self._valid_images += 1
+            self._publish()
             print(f"[FooocArte] Tick: {self._batch_current}/{self._batch_total} (Valid: {self._valid_images})")
 
     def mark_ready(self) -> None:
@@ -95,16 +118,17 @@ class GlobalStateMachine:
     def pause(self) -> None:
         with self._lock:
             self._paused = True
+            self._publish()
             print("[FooocArte] Execution PAUSED")
 
     def resume(self) -> None:
         with self._lock:
             self._paused = False
+            self._publish()
             print("[FooocArte] Execution RESUMED")
 
     def is_paused(self) -> bool:
-        with self._lock:
-            return self._paused
+        return self._snapshot[5]
 
     def complete(self) -> None:
         with self._lock:
@@ -131,4 +155,8 @@ class GlobalStateMachine:
         print(f"[FooocArte] State Change: {self._state.name} -> {new_state.name}")
         self._state = new_state
         if metadata:
-            self._metadata.update(metadata)
+            # Copy-on-write: the persistence writer iterates the published
+            # view without the lock, so never mutate the live dict in place
+            self._metadata = {**self._metadata, **metadata}
+            self._meta_view = MappingProxyType(self._metadata)
+        self._publish()
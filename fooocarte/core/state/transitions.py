@@ -1,3 +1,4 @@
+import threading
 from typing import Optional, Dict, Any
 import ldm_patched.modules.model_management as model_management
 from .global_state import GlobalStateMachine
@@ -12,24 +13,44 @@ class FooocArteEngine(GlobalStateMachine):
         self.logger = TechnicalLogger(self.persistence.log_path)
         self.quality_filter = None
         self.clip_threshold = 0.7
+        self._filter_init_lock = threading.Lock()
 
     def init_quality_filter(self):
-        if self.quality_filter is None:
-            from ..quality.clip_filter import CLIPQualityFilter
-            self.quality_filter = CLIPQualityFilter()
+        """Thread-safe lazy init; concurrent callers block until the model is ready."""
+        if self.quality_filter is not None:
+            return
+        with self._filter_init_lock:
+            if self.quality_filter is None:
+                from ..quality.clip_filter import CLIPQualityFilter
+                self.quality_filter = CLIPQualityFilter()
+
+    def warm_up_quality_filter(self):
+        """Load CLIP in the background so the first image doesn't pay the 1-3 s init."""
+        if self.clip_threshold > 0 and self.quality_filter is None:
+            threading.Thread(target=self.init_quality_filter, daemon=True).start()
+
+    def start_generation(self, metadata: Optional[Dict[str, Any]] = None, total: int = 1) -> None:
+        super().start_generation(metadata, total)
+        # CLIP load overlaps with diffusion model preparation
+        self.warm_up_quality_filter()
 
     def _transition(self, new_state: GlobalState, metadata: Optional[Dict[str, Any]] = None) -> None:
+        changed = new_state != self._state
         super()._transition(new_state, metadata)
-        
+
         # Sync with native Fooocus interruption mechanism
         if new_state == GlobalState.CANCELLING:
             model_management.interrupt_current_processing(True)
         elif new_state == GlobalState.IDLE:
             model_management.interrupt_current_processing(False)
-            
-        # Trigger persistence on every state change
-        self.persistence.save_state_async()
 
-    def tick(self, success: bool = True) -> None:
-        super().tick(success)
-        self.persistence.save_state_async()
+        # Persist only on real state changes; tick counters are reconstructible
+        # from the output directory on recovery, and the background writer's
+        # heartbeat covers liveness between transitions.
+        if changed:
+            self.persistence.save_state_async()
+
+        # Terminal states must leave complete state + log on disk
+        if new_state in (GlobalState.COMPLETADO, GlobalState.ERROR):
+            self.persistence.flush()
+            self.logger.flush()
@@ -1,14 +1,14 @@
+import copy
+
 from ...main import engine
 from ...core.state.state_enum import GlobalState
 
-def sync_ui_state():
-    """Returns visibility and interactivity updates for UI based on Figma mapping."""
-    state = engine.state
-    
+def _build_updates(state):
+    """Compute visibility/interactivity updates for one engine state (Figma mapping)."""
     # Default: IDLE state behavior
     updates = {
         "generate_button": {"interactive": True, "visible": True},
-        "cancel_status_btn": {"visible": False}, 
+        "cancel_status_btn": {"visible": False},
         "pause_status_btn": {"visible": False},
         "resume_status_btn": {"visible": False},
         "reset_engine_button": {"visible": True},
@@ -34,7 +34,7 @@ def sync_ui_state():
         updates["prompt"].update({"interactive": False, "info": lock_msg})
         updates["clip_toggle"].update({"interactive": False, "info": lock_msg})
         updates["drive_toggle"].update({"interactive": False, "info": lock_msg})
-    
+
     elif state == GlobalState.PAUSED:
         updates["generate_button"]["interactive"] = False
         updates["cancel_status_btn"]["visible"] = True
@@ -43,7 +43,7 @@ def sync_ui_state():
         updates["generation_mode"].update({"interactive": False, "info": "Pausado"})
         updates["batch_size"].update({"interactive": False, "info": "Pausado"})
         updates["prompt"].update({"interactive": False, "info": "Pausado"})
-        
+
     elif state in [GlobalState.PREPARING, GlobalState.CANCELLING]:
         updates["generate_button"]["interactive"] = False
         updates["cancel_status_btn"]["visible"] = True
@@ -57,3 +57,12 @@ def sync_ui_state():
         updates["prompt"].update({"interactive": False, "info": "Error de Motor"})
 
     return updates
+
+# The output depends only on the engine state (7 values), so compute each
+# variant once at import and serve lookups instead of rebuilding per poll
+_UI_STATE_TABLE = {state: _build_updates(state) for state in GlobalState}
+
+def sync_ui_state():
+    """Returns visibility and interactivity updates for UI based on Figma mapping."""
+    # Deep copy because Gradio callers mutate the nested dicts in place
+    return copy.deepcopy(_UI_STATE_TABLE[engine.state])
@@ -1,7 +1,15 @@
+import mmap
 import os
 import re
 import shutil
 import subprocess
+import sys
+
+# Patrones precompilados en bytes: un solo compile por ejecución y permiten
+# escanear el archivo mapeado en memoria sin decodificar
+APPROVED_RE = re.compile(rb",\s*approved\s*=\s*[^,)]+")
+IOCOMP_RE = re.compile(rb"\bIOComponent\b")
+DEPRECATION_RE = re.compile(rb"from gradio\.deprecation import .*")
 
 # ---------- Funciones de utilidad ----------
 def run(cmd):
@@ -15,39 +23,49 @@ def backup_file(path):
         print(f"💾 Backup creado: {backup_path}")
 
 def patch_file(path, patterns_replacements):
-    if os.path.exists(path):
-        backup_file(path)
-        with open(path, "r", encoding="utf-8") as f:
-            content = f.read()
-        for pattern, repl in patterns_replacements:
-            content = re.sub(pattern, repl, content)
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(content)
-        print(f"✅ {path} parcheado")
-
-# ---------- 1️⃣ Actualizar dependencias críticas ----------
-print("🔹 Actualizando dependencias críticas...")
-run(["pip", "install", "--upgrade", "gradio==4.44.1"])
-run(["pip", "install", "einops==0.8.0"])
-
-# ---------- 2️⃣ Instalar requirements de Fooocus ----------
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            # Si ningún patrón aparece, evitamos backup + reescritura completa
+            if not any(pattern.search(mm) for pattern, _ in patterns_replacements):
+                print(f"✅ {path} ya estaba parcheado")
+                return
+            content = mm[:]
+        finally:
+            mm.close()
+
+    backup_file(path)
+    for pattern, repl in patterns_replacements:
+        content = pattern.sub(repl, content)
+    with open(path, "wb") as f:
+        f.write(content)
+    print(f"✅ {path} parcheado")
+
+# ---------- 1️⃣ + 2️⃣ Instalar todas las dependencias de una vez ----------
+# Una sola invocación: el resolver de pip planifica todo junto, y
+# sys.executable evita ambigüedad de PATH entre entornos
+print("🔹 Instalando dependencias críticas + requirements de Fooocus...")
+pip_cmd = [sys.executable, "-m", "pip", "install", "--no-input", "--upgrade",
+           "gradio==4.44.1", "einops==0.8.0"]
 if os.path.exists("requirements.txt"):
-    print("🔹 Instalando requirements.txt de Fooocus...")
-    run(["pip", "install", "-r", "requirements.txt"])
+    pip_cmd += ["-r", "requirements.txt"]
 else:
     print("⚠️ No se encontró requirements.txt. Saltando esta parte.")
+run(pip_cmd)
 
 # ---------- 3️⃣ Parchear webui.py ----------
 webui_path = "./webui.py"
 patch_file(webui_path, [
-    (r",\s*approved\s*=\s*[^,)]+", "")  # Elimina cualquier argumento approved=...
+    (APPROVED_RE, b"")  # Elimina cualquier argumento approved=...
 ])
 
 # ---------- 4️⃣ Parchear gradio_hijack.py ----------
 grh_path = "./modules/gradio_hijack.py"
 patch_file(grh_path, [
-    (r"\bIOComponent\b", "Component"),              # Reemplaza IOComponent por Component
-    (r"from gradio\.deprecation import .*", ""),    # Elimina imports obsoletos
+    (IOCOMP_RE, b"Component"),   # Reemplaza IOComponent por Component
+    (DEPRECATION_RE, b""),       # Elimina imports obsoletos
 ])
 
 # ---------- 5️⃣ Mensaje final ----------
@@ -1117,7 +1117,7 @@ def worker():
             return
             
         # Check for recovery data
-        recovery_data = fooocarte.state.persistence.load_previous_session()
+        recovery_data = fooocarte.state.persistence.load_recovery_data()
         resume_index = 0
         if recovery_data:
             print(f"[FooocArte] Detected interrupted session. Resuming from image {recovery_data['batch']['current'] + 1}")
@@ -1361,7 +1361,7 @@ def worker():
             if recovery_data and current_task_id < resume_index:
                 print(f"[FooocArte] Recovery: Skipping task {current_task_id + 1} (already generated)")
                 # Sync current batch counter without rendering
-                fooocarte.state._batch_current = current_task_id + 1
+                fooocarte.state.batch_current = current_task_id + 1
                 continue
 
             progressbar(async_task, current_progress, f'Preparing task {current_task_id + 1}/{async_task.image_number} ...')
@@ -0,0 +1,45 @@
+class BatchComparator:
+    """Tracks the best-scoring image of a batch (Best-of-N selection).
+
+    The comparator itself only ever pins the current best: a beaten
+    candidate is released as soon as the reference is rebound. Note that
+    under the batched scoring flow the caller still holds all N candidates
+    alive until consider_batch returns — allocator cleanup is the job of
+    BatchEngine's periodic gated sweep, not of this class.
+    """
+    def __init__(self):
+        self.best_image = None
+        self.best_score = float("-inf")
+        self.best_metadata = None
+
+    def consider(self, image, score, metadata=None):
+        # No empty_cache here: it forces a device-wide sync, and during a
+        # best-of-N round the caller still references the losers anyway
+        if score > self.best_score:
+            self.best_image = image
+            self.best_score = score
+            self.best_metadata = metadata
+
+    def consider_batch(self, images, scores, metadatas=None):
+        """Vectorized path: one argmax over a whole scored batch.
+
+        `scores` can be a list, numpy array, or torch tensor; callers feeding
+        CLIPQualityFilter.score_batch output land here with a single Python
+        call instead of N scalar compares.
+        """
+        if len(images) == 0:
+            return
+        if hasattr(scores, "argmax"):
+            idx = int(scores.argmax())
+        else:
+            idx = max(range(len(scores)), key=scores.__getitem__)
+        best = float(scores[idx])
+        if best > self.best_score:
+            self.best_image = images[idx]
+            self.best_score = best
+            self.best_metadata = metadatas[idx] if metadatas else None
+
+    def reset(self):
+        self.best_image = None
+        self.best_score = float("-inf")
+        self.best_metadata = None
@@ -0,0 +1,693 @@
+import gc
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+
+import numpy as np
+import torch
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+from fooocarte.core.quality.clip_filter import CLIPQualityFilter
+from modules.batch_comparator import BatchComparator
+from modules.batch_metrics import BatchMetric, BatchMetricsCollector
+from modules.batch_persistence import BatchPersistence
+from modules.controlnet_batch import ControlNetBatchCache
+from modules.faceswap_cache import FaceEmbeddingCache
+
+
+# Shared across engine instances: successive batches reuse the loaded CLIP
+# weights and the warm embedding caches instead of paying a multi-second
+# model load plus cold caches on every run. Keys already namespace inputs,
+# so nothing clears between batches.
+_CN_CACHE = ControlNetBatchCache()
+_FACE_CACHE = FaceEmbeddingCache()
+_CLIP_FILTER = None
+
+
+def _get_clip_filter():
+    global _CLIP_FILTER
+    if _CLIP_FILTER is None:
+        _CLIP_FILTER = CLIPQualityFilter()
+    return _CLIP_FILTER
+
+
+def free_cuda_memory():
+    gc.collect()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+def _to_chw_tensor(image) -> torch.Tensor:
+    """Convert one generated image to a uint8 CHW tensor, converting at most once."""
+    if isinstance(image, torch.Tensor):
+        return image
+    arr = image if isinstance(image, np.ndarray) else np.asarray(image)
+    t = torch.from_numpy(np.ascontiguousarray(arr)).permute(2, 0, 1).contiguous()
+    if torch.cuda.is_available():
+        t = t.pin_memory()
+    return t
+
+
+# Invalidation token: the same image object keeps its key across batches
+# (ui_state carries the object over), so re-runs skip the hash entirely
+_KEY_MEMO = {}
+
+
+def content_key(image) -> int:
+    """Cache key for an input image: xxh3 over an 8x-strided sample.
+
+    Python hash() over the full .tobytes() ran SipHash across every pixel and
+    allocated an image-sized bytes object; the strided sample hashes 1/64th
+    of the data and xxh3 is an order of magnitude faster per byte. Keys are
+    memoized on object identity — a swapped-in image has a new id, so the
+    token invalidates itself.
+    """
+    memo = _KEY_MEMO.get(id(image))
+    if memo is not None and memo[0] is image:
+        return memo[1]
+    key = _compute_content_key(image)
+    _KEY_MEMO[id(image)] = (image, key)
+    if len(_KEY_MEMO) > 128:
+        _KEY_MEMO.clear()
+    return key
+
+
+def _compute_content_key(image) -> int:
+    if hasattr(image, "shape") and getattr(image, "ndim", 0) >= 2:
+        data = image[::8, ::8].tobytes()
+    else:
+        data = bytes(image)
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(data)
+    return hash(data)
+
+
+def basic_quality_filter(image_tensor) -> bool:
+    """Cheap sanity check (flat / black / blown-out) before paying for CLIP."""
+    # Placeholder/fallback tensors carry no signal; skip the reduction + sync
+    if image_tensor.numel() < 16:
+        return True
+    with torch.inference_mode():
+        if not image_tensor.is_floating_point():
+            # uint8 CHW from _to_chw_tensor: scale to the [0,1] thresholds
+            image_tensor = image_tensor.float().div_(255.0)
+        # std_mean reads the tensor once (a memory-bound reduction, so one
+        # pass is half the traffic of mean()+std()); the threshold compares
+        # stay on-device and the boolean verdict is the only sync
+        std, mean = torch.std_mean(image_tensor)
+        ok = (mean > 0.05) & (mean < 0.95) & (std > 0.02)
+        return bool(ok.item())
+
+
+def basic_quality_filter_batch(tensors) -> torch.Tensor:
+    """Vectorized variant for an [N,C,H,W] stack: one pass, one sync, N verdicts."""
+    with torch.inference_mode():
+        if not tensors.is_floating_point():
+            tensors = tensors.float().div_(255.0)
+        dims = tuple(range(1, tensors.dim()))
+        s, m = torch.std_mean(tensors, dim=dims)
+        return ((m > 0.05) & (m < 0.95) & (s > 0.02)).cpu()
+
+
+@dataclass(slots=True)
+class BatchStats:
+    batch_id: str = ""
+    accepted: int = 0
+    rejected: int = 0
+    retries: int = 0
+    start_time: float = 0.0
+    avg_per_image_ema: float = 0.0
+    last_tick_time: float = 0.0
+
+    def tick(self):
+        """Fold one finished image into the per-image duration EMA."""
+        now = time.monotonic()
+        dt = now - (self.last_tick_time or self.start_time)
+        self.avg_per_image_ema = (0.9 * self.avg_per_image_ema + 0.1 * dt
+                                  if self.avg_per_image_ema else dt)
+        self.last_tick_time = now
+
+    def eta(self, current: int, total: int):
+        # EMA of recent durations: no divide per emit, and smoother than
+        # the whole-run average when early iterations were atypical
+        if self.avg_per_image_ema:
+            return round(self.avg_per_image_ema * (total - current), 1)
+        if current <= 0:
+            return None
+        elapsed = time.monotonic() - self.start_time
+        return round(elapsed / current * (total - current), 1)
+
+
+class BatchEngine:
+    """Sequential batch runner: generate, filter, persist, report.
+
+    The UI layer supplies `generate_fn(ui_state) -> result dict` (keys:
+    "image", optional "metadata"/"path"), plus callbacks for saving images
+    and progress events, so the engine stays independent of Gradio.
+    """
+
+    def __init__(self, ui_state, generate_fn, save_callback=None, progress_callback=None):
+        self.ui_state = ui_state
+        self.generate_fn = generate_fn
+        self.save_callback = save_callback
+        self.progress_callback = progress_callback
+
+        # Plain attribute read on the fast path; the Condition only exists
+        # for the rare waiter during an actual pause
+        self._paused = False
+        self._pause_cond = threading.Condition()
+        self.stop_event = threading.Event()
+        # uuid4 hits os.urandom (a syscall): generate the id once here
+        # rather than in a default_factory on every BatchStats construction
+        self.stats = BatchStats(batch_id=uuid.uuid4().hex[:8],
+                                start_time=time.monotonic())
+        self.clip_scores = []
+
+        self.clip_filter = None
+        if self.ui_state.get("clip_enabled"):
+            self.clip_filter = _get_clip_filter()
+        # The threshold can't change mid-batch: read it once, and it doubles
+        # as the comparison bound for the vectorized flush pass
+        self._clip_threshold = float(self.ui_state.get("clip_threshold", 0.25))
+
+        self.controlnet_cache = _CN_CACHE
+        self.face_cache = _FACE_CACHE
+        self.persistence = BatchPersistence()
+        self.metrics = BatchMetricsCollector()
+
+        # Images waiting for the batched CLIP pass:
+        # (index, chw_tensor, original_image, prompt, metadata)
+        self._pending_for_clip = []
+        # One comparator reused (reset per image) across best-of-N rounds
+        self._comparator = BatchComparator()
+        # PNG encode + disk write (50-300 ms) overlap the next generation;
+        # images are never mutated after dispatch, so handing off is safe
+        self._save_pool = ThreadPoolExecutor(max_workers=2)
+
+        # Checkpoint/metrics writes run on one daemon thread so disk latency
+        # (hundreds of ms on Drive-backed filesystems) never stalls the GPU
+        # loop; the bound keeps memory flat if the disk falls behind
+        self._io_q = queue.Queue(maxsize=4)
+        self._io_thread = threading.Thread(target=self._io_loop, daemon=True)
+        self._io_thread.start()
+
+        # Progress events reuse one payload dict; only the mutable fields
+        # change between emits, and routine ticks are throttled to 10 Hz
+        self._event_payload = {
+            "batch_id": self.stats.batch_id,
+            "current": 0,
+            "total": 0,
+            "accepted": 0,
+            "rejected": 0,
+            "status": "",
+            "message": "",
+            "eta": None,
+        }
+        self._last_emit_ts = 0.0
+        # Real size of the current run: run()/_run_folder_mode() set it
+        # (folder mode's total is len(files), not batch_size)
+        self._run_total = int(self.ui_state.get("batch_size", 1))
+
+    # ------------------------------------------------------------------ events
+
+    def log(self, message: str):
+        print(message)
+
+    # Per-image progress messages start with these; they can be dropped
+    # under throttling, unlike state-change milestones
+    _ROUTINE_PREFIXES = ("Generando", "Procesando")
+
+    def emit(self, status: str, message: str):
+        if self.progress_callback is None:
+            return
+        now = time.monotonic()
+        if (message.startswith(self._ROUTINE_PREFIXES)
+                and now - self._last_emit_ts < 0.1):
+            return
+        self._last_emit_ts = now
+
+        total = self._run_total
+        # Images queued for the deferred CLIP flush are done generating but
+        # not yet accepted/rejected; without them the progress (and the ETA
+        # base) would sit at zero for the whole run in single+CLIP mode
+        current = (self.stats.accepted + self.stats.rejected
+                   + len(self._pending_for_clip))
+        payload = self._event_payload
+        payload["current"] = current
+        payload["total"] = total
+        payload["accepted"] = self.stats.accepted
+        payload["rejected"] = self.stats.rejected
+        payload["status"] = status
+        payload["message"] = message
+        payload["eta"] = self.stats.eta(current, total)
+        self.progress_callback(payload)
+
+    def pause(self):
+        self._paused = True
+        self._drain_io()
+
+    def resume(self):
+        self._paused = False
+        with self._pause_cond:
+            self._pause_cond.notify_all()
+
+    def cancel(self):
+        self.stop_event.set()
+        self._paused = False
+        with self._pause_cond:
+            self._pause_cond.notify_all()
+        self._drain_io()
+
+    def _wait_if_paused(self):
+        # Fast path: a single attribute load, no lock traffic per iteration
+        if not self._paused:
+            return
+        with self._pause_cond:
+            self._pause_cond.wait_for(
+                lambda: not self._paused or self.stop_event.is_set())
+
+    # ------------------------------------------------------------- background IO
+
+    def _io_loop(self):
+        while True:
+            item = self._io_q.get()
+            try:
+                if item is None:
+                    return
+                kind, payload = item
+                if kind == "state":
+                    batch_id, state = payload
+                    self.persistence.save_state_fast(batch_id, state)
+                elif kind == "metric":
+                    self.metrics.save(payload)
+                    self.log(f"[Batch] Metrics saved for batch {self.stats.batch_id}")
+            except Exception as e:
+                self.log(f"[Batch] IO error: {e}")
+            finally:
+                self._io_q.task_done()
+
+    def _queue_state(self, current: int, total: int):
+        self._io_q.put(("state", (self.stats.batch_id, {
+            "batch_id": self.stats.batch_id,
+            "current": current,
+            "total": total,
+            "accepted": self.stats.accepted,
+            "rejected": self.stats.rejected,
+            "retries": self.stats.retries,
+        })))
+
+    def _drain_io(self):
+        """Wait for queued writes to land, then flush the OS buffers."""
+        self._io_q.join()
+        self.persistence.flush()
+
+    # -------------------------------------------------------------------- run
+
+    def run(self):
+        if self.ui_state.get("input_folder"):
+            return self._run_folder_mode()
+
+        batch_size = int(self.ui_state.get("batch_size", 1))
+        self._run_total = batch_size
+        self.emit("RUNNING", "Iniciando batch...")
+
+        # Input images don't change across the batch: hash, look up, and
+        # inject their derived data once instead of per iteration. The GPU
+        # side of that prep runs on a side stream so it overlaps the CLIP
+        # warm-up and first-iteration setup on the default stream.
+        prep_stream = torch.cuda.Stream() if torch.cuda.is_available() else None
+        with torch.cuda.stream(prep_stream) if prep_stream else nullcontext():
+            if self.ui_state.get("controlnet_enabled") and "controlnet_image" in self.ui_state:
+                cn_key = content_key(self.ui_state["controlnet_image"])
+                self.ui_state["controlnet_data"] = self.controlnet_cache.get_or_compute(
+                    cn_key, self._prepare_controlnet)
+            if self.ui_state.get("faceswap_enabled") and "faceswap_image" in self.ui_state:
+                fs_key = content_key(self.ui_state["faceswap_image"])
+                self.ui_state["faceswap_embedding"] = self.face_cache.get_embedding(
+                    self.ui_state["faceswap_image"], self._compute_face_embedding, key=fs_key)
+        if prep_stream is not None:
+            torch.cuda.current_stream().wait_stream(prep_stream)
+
+        # All iterations draw from one allocator pool, so iteration N reuses
+        # iteration N-1's segments instead of churning cudaMalloc/cudaFree
+        with self._mem_pool_ctx():
+            for i in range(batch_size):
+                self._wait_if_paused()
+                if self.stop_event.is_set():
+                    break
+
+                try:
+                    self._run_single(i, batch_size)
+                except torch.cuda.OutOfMemoryError:
+                    self.stats.rejected += 1
+                    self.log(f"[Batch] Imagen {i + 1} fallida: CUDA OOM, liberando memoria")
+                    free_cuda_memory()
+                except Exception as e:
+                    self.stats.rejected += 1
+                    self.log(f"[Batch] Imagen {i + 1} fallida: {e}")
+
+                self.stats.tick()
+                self._maybe_sweep_cuda(i, batch_size)
+                self._queue_state(i + 1, batch_size)
+                self.emit("RUNNING", f"Generando imagen {i + 1}/{batch_size}...")
+
+            self._flush_clip_queue()
+
+        free_cuda_memory()
+        self._drain_io()
+        self._final_report(batch_size)
+
+    def _mem_pool_ctx(self):
+        """Pool context for the batch loop (PyTorch >= 2.3, eager fallback)."""
+        if not torch.cuda.is_available():
+            return nullcontext()
+        try:
+            # Expandable segments let the pool grow without fragmenting when
+            # fooocus_run's activation sizes vary between iterations
+            torch.cuda.memory._set_allocator_settings("expandable_segments:True")
+        except Exception:
+            pass
+        try:
+            return torch.cuda.use_mem_pool(torch.cuda.MemPool())
+        except (AttributeError, RuntimeError) as e:
+            self.log(f"[Batch] MemPool no disponible, usando allocator global: {e}")
+            return nullcontext()
+
+    # Reserved-memory level above which the periodic sweep actually runs
+    _SWEEP_RESERVED_BYTES = 6 << 30
+
+    def _maybe_sweep_cuda(self, index: int, batch_size: int):
+        """Sweep the allocator at most every batch_size//4 images, and only
+        when the reserved pool is actually large."""
+        if not torch.cuda.is_available():
+            return
+        interval = max(1, batch_size // 4)
+        if (index + 1) % interval == 0 and torch.cuda.memory_reserved() > self._SWEEP_RESERVED_BYTES:
+            free_cuda_memory()
+
+    def _run_single(self, index: int, total: int):
+        # No per-image free_cuda_memory() here: emptying the allocator cache
+        # forces a device sync and the next generation re-allocates the same
+        # blocks. inference_mode keeps autograd from retaining anything, and
+        # run() does a periodic gated sweep instead.
+        with torch.inference_mode():
+            best_of_n = int(self.ui_state.get("best_of_n", 1))
+            if best_of_n > 1:
+                self._run_best_of_n(index, best_of_n)
+                return
+
+            result = self.generate_fn(self.ui_state)
+            image = result["image"]
+            img_to_score = image
+            if isinstance(image, list):
+                img_to_score = image[0]
+
+            metadata = result.get("metadata", {})
+            if self.clip_filter is not None:
+                # Deferred: the basic sanity filter and the CLIP score both
+                # run vectorized over the whole queue in _flush_clip_queue.
+                # Queue a stack-ready CHW tensor (pinned when CUDA is up) so the
+                # flush can upload with one non-blocking copy, no PIL round-trip.
+                self._pending_for_clip.append(
+                    (index, _to_chw_tensor(img_to_score), img_to_score,
+                     self.ui_state.get("prompt", ""), metadata))
+                return
+
+            if "image_tensor" in result and not basic_quality_filter(result["image_tensor"]):
+                self.stats.rejected += 1
+                self.log(f"[Batch] Imagen {index + 1} rechazada por filtro básico")
+                return
+
+            self.stats.accepted += 1
+            self._dispatch_save(img_to_score, metadata)
+
+    def _run_best_of_n(self, index: int, n: int):
+        """Generate N candidates and keep only the best CLIP scorer."""
+        comparator = self._comparator
+        comparator.reset()
+        prompt = self.ui_state.get("prompt", "")
+
+        # Generate every candidate first, then score them in one stacked
+        # CLIP forward: N kernel launches collapse into one and the image
+        # tower actually sees a full batch
+        candidates = []
+        metadatas = []
+        for _ in range(n):
+            result = self.generate_fn(self.ui_state)
+            image = result["image"]
+            if isinstance(image, list):
+                image = image[0]
+            candidates.append(image)
+            metadatas.append(result.get("metadata", {}))
+
+        if self.clip_filter is not None:
+            scores = self.clip_filter.score_batch(candidates, prompt)
+        else:
+            scores = [1.0] * len(candidates)
+        comparator.consider_batch(candidates, scores, metadatas)
+
+        if comparator.best_image is None:
+            self.stats.rejected += 1
+            return
+        if comparator.best_score < self._clip_threshold:
+            # Count-and-return like the no-candidate branch above: raising
+            # here would make the caller's except count the round a second
+            # time and mislog a quality rejection as a failure
+            self.stats.rejected += 1
+            self.log(
+                f"[Batch] Imagen {index + 1} rechazada por CLIP "
+                f"(best-of-{n}, {comparator.best_score:.4f} < {self._clip_threshold})")
+            return
+
+        metadata = dict(comparator.best_metadata or {})
+        metadata["clip_score"] = comparator.best_score
+        self.stats.accepted += 1
+        self.clip_scores.append(comparator.best_score)
+        self._dispatch_save(comparator.best_image, metadata)
+
+    def _flush_clip_queue(self):
+        """Score every queued image in one CLIP forward pass and dispatch."""
+        if not self._pending_for_clip or self.clip_filter is None:
+            self._pending_for_clip = []
+            return
+
+        pending = self._pending_for_clip
+        self._pending_for_clip = []
+        threshold = self._clip_threshold
+
+        # Cheap vectorized sanity filter before paying for CLIP: one fused
+        # reduction and one sync for the whole queue instead of a per-image
+        # std/mean round-trip in _run_single
+        tensors = [t for _, t, _, _, _ in pending]
+        if len({t.shape for t in tensors}) == 1:
+            verdicts = basic_quality_filter_batch(torch.stack(tensors)).tolist()
+        else:
+            # Mixed sizes (folder mode) can't stack; fall back per image
+            verdicts = [basic_quality_filter(t) for t in tensors]
+        survivors = []
+        for item, ok in zip(pending, verdicts):
+            if ok:
+                survivors.append(item)
+            else:
+                self.stats.rejected += 1
+                self.log(f"[Batch] Imagen {item[0] + 1} rechazada por filtro básico")
+        if not survivors:
+            return
+        pending = survivors
+
+        # One prompt per batch run: the text encoder runs once and the image
+        # encoder sees a single stacked tensor instead of N singleton batches
+        prompt = pending[0][3]
+        scores = self.clip_filter.score_batch([t for _, t, _, _, _ in pending], prompt)
+
+        for (index, _, image, _, metadata), score in zip(pending, scores):
+            self.clip_scores.append(score)
+            if score < threshold:
+                self.stats.rejected += 1
+                self.log(f"[Batch] Imagen {index + 1} rechazada por CLIP ({score:.4f})")
+                continue
+            # Full precision kept; consumers format for display
+            metadata = dict(metadata)
+            metadata["clip_score"] = score
+            self.stats.accepted += 1
+            self._dispatch_save(image, metadata)
+
+    def _dispatch_save(self, image, metadata):
+        """Hand the accepted image to the save pool; encoding overlaps the GPU."""
+        if self.save_callback is not None:
+            self._save_pool.submit(self._safe_save, image, metadata)
+
+    def _safe_save(self, image, metadata):
+        try:
+            self.save_callback(image, metadata)
+        except Exception as e:
+            self.log(f"[Batch] Error guardando imagen: {e}")
+
+    # ----------------------------------------------------------- folder mode
+
+    def _run_folder_mode(self):
+        folder = self.ui_state["input_folder"]
+        # One directory scan instead of five glob passes with per-entry fnmatch
+        exts = {".png", ".jpg", ".jpeg", ".webp", ".bmp"}
+        files = sorted(e.path for e in os.scandir(folder)
+                       if e.is_file() and os.path.splitext(e.name)[1].lower() in exts)
+
+        if not files:
+            self.log(f"[Batch] No se encontraron imágenes en {folder}")
+            self._final_report(0)
+            return
+
+        total = len(files)
+        self._run_total = total
+        self.emit("RUNNING", f"Procesando carpeta: {total} archivos...")
+
+        # Two-stage pipeline: a decoder thread stays ahead of the GPU while
+        # the shared IO thread persists behind it, so total time approaches
+        # max(decode, generate, persist) per file instead of their sum
+        decoded_q = queue.Queue(maxsize=2)
+
+        def _decoder():
+            try:
+                for idx, path in enumerate(files):
+                    if self.stop_event.is_set():
+                        return
+                    decoded_q.put((idx, path, self._decode_and_prep(path)))
+            finally:
+                decoded_q.put(None)
+
+        decoder = threading.Thread(target=_decoder, daemon=True)
+        decoder.start()
+
+        while True:
+            self._wait_if_paused()
+            if self.stop_event.is_set():
+                break
+
+            item = decoded_q.get()
+            if item is None:
+                break
+            f_idx, file_path, img_rgb = item
+
+            if img_rgb is None:
+                self.stats.rejected += 1
+                self.log(f"[Batch] No se pudo leer {file_path}")
+                continue
+            self.ui_state["input_image"] = img_rgb
+
+            try:
+                self._run_single(f_idx, total)
+            except Exception as e:
+                self.stats.rejected += 1
+                self.log(f"[Batch] Archivo {file_path} fallido: {e}")
+
+            self._flush_clip_queue()
+            self.stats.tick()
+            self._queue_state(f_idx + 1, total)
+            self.emit("RUNNING", f"Procesando archivo {f_idx + 1}/{total}...")
+
+        # On cancel, drain so the blocked decoder can observe stop_event
+        if self.stop_event.is_set():
+            while True:
+                try:
+                    decoded_q.get_nowait()
+                except queue.Empty:
+                    break
+
+        self._drain_io()
+        self._final_report(total)
+
+    # ---------------------------------------------------------------- report
+
+    def _final_report(self, total: int):
+        # Every accepted image must be on disk before we report COMPLETADO
+        self._save_pool.shutdown(wait=True)
+        elapsed = time.monotonic() - self.stats.start_time
+        # Raw floats throughout; rounding happens only in the log format below
+        report = {
+            "batch_id": self.stats.batch_id,
+            "total": total,
+            "accepted": self.stats.accepted,
+            "rejected": self.stats.rejected,
+            "retries": self.stats.retries,
+            "elapsed": elapsed,
+            "per_image": elapsed / max(1, total),
+        }
+        c_avg = c_min = c_max = 0.0
+        if self.clip_scores:
+            # Single SIMD pass over the scores instead of three Python loops
+            arr = np.asarray(self.clip_scores, dtype=np.float32)
+            c_avg = float(arr.mean())
+            c_min = float(arr.min())
+            c_max = float(arr.max())
+            report["clip_avg"] = c_avg
+            report["clip_min"] = c_min
+            report["clip_max"] = c_max
+
+        self.log(
+            f"[Batch] Reporte final {report['batch_id']}: "
+            f"{report['accepted']}/{report['total']} aceptadas, "
+            f"{report['rejected']} rechazadas, {report['retries']} reintentos, "
+            f"{report['elapsed']:.2f}s ({report['per_image']:.2f}s/img)"
+            + (f", CLIP avg {c_avg:.4f} min {c_min:.4f} max {c_max:.4f}"
+               if self.clip_scores else ""))
+        try:
+            metric = BatchMetric(
+                batch_id=self.stats.batch_id, total=total,
+                accepted=self.stats.accepted, rejected=self.stats.rejected,
+                retries=self.stats.retries, elapsed=elapsed,
+                clip_avg=c_avg, clip_min=c_min, clip_max=c_max)
+            # Disk write runs on the IO thread so the final emit isn't blocked
+            self._io_q.put(("metric", metric))
+        except Exception as e:
+            self.log(f"[Batch] Metrics error: {e}")
+        self.emit("COMPLETADO", "Batch finalizado")
+        return report
+
+    def shutdown(self):
+        """Flush pending background writes and stop the IO thread."""
+        self._save_pool.shutdown(wait=True)
+        self._io_q.put(None)
+        self._io_thread.join(timeout=5.0)
+        self.persistence.close()
+
+    # --------------------------------------------------------------- helpers
+
+    def _decode_and_prep(self, file_path):
+        """Decode one input file to an RGB numpy array (runs on the pool)."""
+        if cv2 is None:
+            # cv2 is optional; PIL covers the same formats, just slower
+            from PIL import Image
+            try:
+                return np.asarray(Image.open(file_path).convert("RGB"))
+            except OSError:
+                return None
+
+        # OpenCV >= 4.10 can decode straight to RGB; older builds decode BGR
+        # and swap channels in place rather than allocating a second buffer
+        flags = getattr(cv2, "IMREAD_COLOR_RGB", cv2.IMREAD_COLOR)
+        img = cv2.imread(file_path, flags)
+        if img is None:
+            return None
+        if flags == cv2.IMREAD_COLOR:
+            cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=img)
+        return img
+
+    def _prepare_controlnet(self):
+        from modules.core import numpy_to_pytorch
+        return numpy_to_pytorch(self.ui_state["controlnet_image"])
+
+    def _compute_face_embedding(self, image):
+        from extras.ip_adapter import preprocess
+        return preprocess(image, ip_adapter_path=self.ui_state.get("ip_adapter_face_path"))
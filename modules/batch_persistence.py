@@ -0,0 +1,113 @@
+import mmap
+import os
+import struct
+
+try:
+    import orjson
+    def _dumps(obj):
+        return orjson.dumps(obj)
+    def _loads(data):
+        return orjson.loads(data)
+except ImportError:
+    import json
+    def _dumps(obj):
+        return json.dumps(obj).encode("utf-8")
+    def _loads(data):
+        return json.loads(data)
+
+# Header layout: (offset of last state line, ticks written)
+_HEADER_FMT = "<QQ"
+_HEADER_SIZE = 64
+
+
+class BatchPersistence:
+    """Persists batch progress so an interrupted run can be diagnosed or resumed.
+
+    States append to an NDJSON log on a cached file handle — each tick
+    costs one ~80-byte buffered write instead of a full rewrite of the
+    state file. A small mmap'd header tracks the offset of the last line
+    so recovery reads exactly one line, never the whole history.
+    """
+
+    # Paths already created this process: one stat per path, not per open
+    _dir_ready = set()
+
+    def __init__(self, base_dir=None):
+        self.base_dir = base_dir or os.path.join(os.path.abspath(".fooocarte"), "batch")
+        self._fhs = {}
+
+    def _open(self, batch_id):
+        entry = self._fhs.get(batch_id)
+        if entry is not None:
+            return entry
+        if self.base_dir not in BatchPersistence._dir_ready:
+            os.makedirs(self.base_dir, exist_ok=True)
+            BatchPersistence._dir_ready.add(self.base_dir)
+        log = open(os.path.join(self.base_dir, f"batch_{batch_id}.ndjson"), "ab")
+        hdr_path = os.path.join(self.base_dir, f"batch_{batch_id}.hdr")
+        with open(hdr_path, "ab") as f:
+            if f.tell() < _HEADER_SIZE:
+                f.write(b"\0" * (_HEADER_SIZE - f.tell()))
+        hdr_fh = open(hdr_path, "r+b")
+        header = mmap.mmap(hdr_fh.fileno(), _HEADER_SIZE)
+        entry = (log, hdr_fh, header)
+        self._fhs[batch_id] = entry
+        return entry
+
+    def save_state_fast(self, batch_id, state):
+        """Append one state line; no fsync, the OS flushes behind us."""
+        try:
+            log, _, header = self._open(batch_id)
+            offset = log.tell()
+            log.write(_dumps(state) + b"\n")
+            _, ticks = struct.unpack_from(_HEADER_FMT, header)
+            struct.pack_into(_HEADER_FMT, header, 0, offset, ticks + 1)
+        except Exception as e:
+            print(f"[Batch] Persistence error: {e}")
+
+    def save_state(self, stats, current, total, force=False):
+        self.save_state_fast(stats.batch_id, {
+            "batch_id": stats.batch_id,
+            "current": current,
+            "total": total,
+            "accepted": stats.accepted,
+            "rejected": stats.rejected,
+            "retries": stats.retries,
+        })
+
+    def flush(self):
+        for log, _, header in self._fhs.values():
+            try:
+                log.flush()
+                header.flush()
+            except Exception as e:
+                print(f"[Batch] Persistence error: {e}")
+
+    def close(self):
+        self.flush()
+        for log, hdr_fh, header in self._fhs.values():
+            try:
+                header.close()
+                hdr_fh.close()
+                log.close()
+            except Exception:
+                pass
+        self._fhs.clear()
+
+    def load_state(self, batch_id):
+        """Reconstruct the last persisted state from the header offset."""
+        log_path = os.path.join(self.base_dir, f"batch_{batch_id}.ndjson")
+        hdr_path = os.path.join(self.base_dir, f"batch_{batch_id}.hdr")
+        if not os.path.exists(log_path):
+            return None
+        try:
+            offset = 0
+            if os.path.exists(hdr_path):
+                with open(hdr_path, "rb") as f:
+                    offset, _ = struct.unpack_from(_HEADER_FMT, f.read(_HEADER_SIZE))
+            with open(log_path, "rb") as f:
+                f.seek(offset)
+                line = f.readline().strip()
+            return _loads(line) if line else None
+        except Exception:
+            return None
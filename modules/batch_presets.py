@@ -0,0 +1,72 @@
+import json
+import os
+import threading
+
+try:
+    import orjson
+    def _loads(data):
+        return orjson.loads(data)
+except ImportError:
+    def _loads(data):
+        return json.loads(data)
+
+
+class BatchPresetManager:
+    """Gestor de presets de batch (singleton).
+
+    Los presets se releen solo cuando cambia el archivo: la caché se
+    indexa por (ruta, mtime_ns), así que cargar el mismo preset en cada
+    batch es un lookup de dict en lugar de una lectura + parseo JSON.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls, base_dir=None):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance.base_dir = base_dir or os.path.join(
+                        os.path.abspath(".fooocarte"), "presets")
+                    instance._cache = {}
+                    cls._instance = instance
+        return cls._instance
+
+    def _path(self, preset_name):
+        return os.path.join(self.base_dir, f"{preset_name}.json")
+
+    def load(self, preset_name):
+        path = self._path(preset_name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = (path, st.st_mtime_ns)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        try:
+            with open(path, "rb") as f:
+                data = _loads(f.read())
+        except (OSError, ValueError) as e:
+            print(f"[Batch] Error cargando preset {preset_name}: {e}")
+            return None
+        self._cache[key] = data
+        return data
+
+    def save(self, preset_name, settings):
+        os.makedirs(self.base_dir, exist_ok=True)
+        path = self._path(preset_name)
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(settings, f, indent=2)
+        except OSError as e:
+            print(f"[Batch] Error guardando preset {preset_name}: {e}")
+
+    def list_presets(self):
+        if not os.path.isdir(self.base_dir):
+            return []
+        return sorted(os.path.splitext(e.name)[0]
+                      for e in os.scandir(self.base_dir)
+                      if e.is_file() and e.name.endswith(".json"))
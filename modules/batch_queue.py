@@ -0,0 +1,51 @@
+import threading
+# deque.append/popleft are single C-level ops, atomic under CPython's GIL;
+# a PyPy port would need the per-operation lock back
+from collections import deque
+
+
+class BatchQueue:
+    """Cola FIFO de batches pendientes (singleton).
+
+    Solo la construcción toma el lock: las operaciones de lectura y
+    escritura usan deque directamente, cuyos append/popleft son atómicos
+    en CPython, así que cada encolado/desencolado se ahorra dos
+    pthread_mutex_lock — relevante cuando la UI consulta longitud() en
+    cada tick.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance.cola = deque()
+                    cls._instance = instance
+        return cls._instance
+
+    def agregar(self, batch_task):
+        self.cola.append(batch_task)
+        return len(self.cola)
+
+    def agregar_todos(self, batch_tasks):
+        """Encolado masivo: un solo extend en C en vez de N appends."""
+        self.cola.extend(batch_tasks)
+        return len(self.cola)
+
+    def obtener_siguiente(self):
+        try:
+            return self.cola.popleft()
+        except IndexError:
+            return None
+
+    def esta_vacia(self):
+        return not self.cola
+
+    def longitud(self):
+        return len(self.cola)
+
+    def limpiar(self):
+        self.cola.clear()
@@ -0,0 +1,110 @@
+"""
+Batch State Machine for FooocArte
+Máquina de estados del ciclo de vida de un batch (INACTIVO → PREPARANDO →
+EJECUTANDO → ...). Valida cada transición contra una tabla fija y lanza
+RuntimeError ante transiciones ilegales, para que la UI nunca pueda dejar
+el batch en un estado incoherente.
+"""
+
+from enum import Enum
+
+
+class EstadoBatch(Enum):
+    INACTIVO = "inactivo"
+    PREPARANDO = "preparando"
+    EJECUTANDO = "ejecutando"
+    EN_PAUSA = "en_pausa"
+    CANCELANDO = "cancelando"
+    COMPLETADO = "completado"
+    ERROR = "error"
+
+
+# Tabla de transiciones válidas, congelada en import: validar es un índice
+# de dict más un test de pertenencia en frozenset
+_TRANSICIONES_VALIDAS = {
+    EstadoBatch.INACTIVO: frozenset({EstadoBatch.PREPARANDO}),
+    EstadoBatch.PREPARANDO: frozenset({EstadoBatch.EJECUTANDO, EstadoBatch.ERROR}),
+    EstadoBatch.EJECUTANDO: frozenset({EstadoBatch.EN_PAUSA, EstadoBatch.CANCELANDO,
+                                       EstadoBatch.COMPLETADO, EstadoBatch.ERROR}),
+    EstadoBatch.EN_PAUSA: frozenset({EstadoBatch.EJECUTANDO, EstadoBatch.CANCELANDO,
+                                     EstadoBatch.ERROR}),
+    EstadoBatch.CANCELANDO: frozenset({EstadoBatch.COMPLETADO, EstadoBatch.ERROR}),
+    EstadoBatch.COMPLETADO: frozenset({EstadoBatch.INACTIVO}),
+    EstadoBatch.ERROR: frozenset({EstadoBatch.INACTIVO}),
+}
+
+
+class BatchStateMachine:
+    """Estado del batch en curso: estado actual, progreso y último error."""
+
+    __slots__ = ('estado', 'imagen_actual', 'total', 'error')
+
+    def __init__(self):
+        self.estado = EstadoBatch.INACTIVO
+        self.imagen_actual = 0
+        self.total = 0
+        self.error = None
+
+    def _transicion(self, nuevo_estado):
+        if nuevo_estado not in _TRANSICIONES_VALIDAS[self.estado]:
+            raise RuntimeError(
+                f"Transición inválida: {self.estado.value} → {nuevo_estado.value}")
+        self.estado = nuevo_estado
+
+    def iniciar(self, total):
+        if total <= 0:
+            raise ValueError(f"El total debe ser positivo, recibido: {total}")
+        self._transicion(EstadoBatch.PREPARANDO)
+        self.total = total
+        self.imagen_actual = 0
+
+    def preparado(self):
+        # EN_PAUSA → EJECUTANDO también es una arista válida (reanudar),
+        # así que este método valida su propio estado de origen
+        if self.estado != EstadoBatch.PREPARANDO:
+            raise RuntimeError(
+                f"preparado() requiere PREPARANDO, estado actual: {self.estado.value}")
+        self._transicion(EstadoBatch.EJECUTANDO)
+
+    def tick(self):
+        if self.estado != EstadoBatch.EJECUTANDO:
+            raise RuntimeError(
+                f"tick() solo es válido en EJECUTANDO, estado actual: {self.estado.value}")
+        self.imagen_actual += 1
+        if self.imagen_actual >= self.total:
+            self._transicion(EstadoBatch.COMPLETADO)
+
+    def pausar(self):
+        if self.estado != EstadoBatch.EJECUTANDO:
+            raise RuntimeError(
+                f"No se puede pausar desde {self.estado.value}")
+        self._transicion(EstadoBatch.EN_PAUSA)
+
+    def reanudar(self):
+        if self.estado != EstadoBatch.EN_PAUSA:
+            raise RuntimeError(
+                f"No se puede reanudar desde {self.estado.value}")
+        self._transicion(EstadoBatch.EJECUTANDO)
+
+    def cancelar(self):
+        self._transicion(EstadoBatch.CANCELANDO)
+
+    def cancelar_completado(self):
+        if self.estado != EstadoBatch.CANCELANDO:
+            raise RuntimeError(
+                f"cancelar_completado() requiere CANCELANDO, estado actual: {self.estado.value}")
+        self._transicion(EstadoBatch.COMPLETADO)
+
+    def error_fatal(self, mensaje):
+        self._transicion(EstadoBatch.ERROR)
+        self.error = mensaje
+
+    def reset(self):
+        self._transicion(EstadoBatch.INACTIVO)
+        self.imagen_actual = 0
+        self.total = 0
+        self.error = None
+
+    def __repr__(self):
+        return (f"<BatchStateMachine estado={self.estado.value} "
+                f"{self.imagen_actual}/{self.total}>")
@@ -1,11 +1,28 @@
+from collections import OrderedDict
+
+
 class ControlNetBatchCache:
-    def __init__(self):
-        self.cached_inputs = {}
+    """LRU-bounded cache of preprocessed ControlNet inputs.
+
+    Entries hold GPU tensors, so an unbounded dict would grow VRAM for
+    the life of the session; least-recently-used inputs drop off once
+    maxsize distinct images have been seen.
+    """
+
+    def __init__(self, maxsize=64):
+        self.cached_inputs = OrderedDict()
+        self.maxsize = maxsize
 
     def get_or_compute(self, key, compute_fn):
-        if key not in self.cached_inputs:
-            self.cached_inputs[key] = compute_fn()
-        return self.cached_inputs[key]
+        cached = self.cached_inputs.get(key)
+        if cached is not None:
+            self.cached_inputs.move_to_end(key)
+            return cached
+        value = compute_fn()
+        self.cached_inputs[key] = value
+        if len(self.cached_inputs) > self.maxsize:
+            self.cached_inputs.popitem(last=False)
+        return value
 
     def clear(self):
         self.cached_inputs.clear()
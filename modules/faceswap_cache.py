@@ -1,12 +1,53 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+def _content_key(image):
+    """Hash a strided subsample instead of the full ~3 MB pixel buffer."""
+    sample = np.asarray(image)[::8, ::8].tobytes()
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(sample)
+    return int.from_bytes(hashlib.blake2b(sample, digest_size=8).digest(), "little")
+
+
 class FaceEmbeddingCache:
-    def __init__(self):
-        self.cache = {}
+    """LRU-bounded: embeddings live on GPU, so eviction keeps VRAM flat."""
+
+    def __init__(self, maxsize=64):
+        self.cache = OrderedDict()
+        self.maxsize = maxsize
+        self._id_cache = {}
 
-    def get_embedding(self, image, compute_fn):
-        key = hash(image.tobytes())
-        if key not in self.cache:
-            self.cache[key] = compute_fn(image)
-        return self.cache[key]
+    def get_embedding(self, image, compute_fn, key=None):
+        if key is None:
+            # Same object re-passed across the batch: skip hashing entirely.
+            # The memo keeps (image, key) and validates identity on hit —
+            # id() alone can alias a new image at a recycled address once
+            # the original is garbage-collected
+            memo = self._id_cache.get(id(image))
+            if memo is not None and memo[0] is image:
+                key = memo[1]
+            else:
+                key = _content_key(image)
+                self._id_cache[id(image)] = (image, key)
+                if len(self._id_cache) > 128:
+                    self._id_cache.clear()
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+            return cached
+        value = compute_fn(image)
+        self.cache[key] = value
+        if len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+        return value
 
     def clear(self):
         self.cache.clear()
+        self._id_cache.clear()
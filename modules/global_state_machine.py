@@ -0,0 +1,286 @@
+"""
+Global State Machine for FooocArte
+Tracks the generation lifecycle (idle → preparing → running → ...) with
+thread-safe transitions and a transition history for diagnostics.
+"""
+
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from enum import Enum
+from types import MappingProxyType
+from typing import NamedTuple
+
+
+class _HistEntry(NamedTuple):
+    """One transition record: ~3x smaller than the equivalent dict and
+    built without any hash-table inserts."""
+    from_state: str
+    to_state: str
+    timestamp_ns: int
+
+
+class GlobalState(Enum):
+    IDLE = "idle"
+    PREPARING = "preparing"
+    RUNNING = "running"
+    PAUSED = "paused"
+    COMPLETED = "completed"
+    CANCELLING = "cancelling"
+    ERROR = "error"
+
+
+class StateTransitionError(Exception):
+    """Raised when an invalid state transition is attempted."""
+
+
+# Interned value strings: a dict index instead of the enum descriptor
+# chain (member -> _value_) on every transition
+_STATE_VALUES = {s: sys.intern(s.value) for s in GlobalState}
+
+
+# Every state is keyed, so transition validation is one dict index plus a
+# frozenset membership test — no .get() default allocation, no missing-key
+# branch. Frozen because the table never changes after import.
+_VALID_TRANSITIONS = {
+    GlobalState.IDLE: frozenset({GlobalState.PREPARING}),
+    GlobalState.PREPARING: frozenset({GlobalState.RUNNING, GlobalState.ERROR}),
+    GlobalState.RUNNING: frozenset({GlobalState.PAUSED, GlobalState.COMPLETED,
+                                    GlobalState.CANCELLING, GlobalState.ERROR}),
+    GlobalState.PAUSED: frozenset({GlobalState.RUNNING, GlobalState.CANCELLING,
+                                   GlobalState.ERROR}),
+    GlobalState.COMPLETED: frozenset({GlobalState.IDLE}),
+    GlobalState.CANCELLING: frozenset({GlobalState.IDLE}),
+    GlobalState.ERROR: frozenset({GlobalState.IDLE}),
+}
+
+
+# One flag bit per predicate; each state's mask ORs together everything
+# true in that state, so every query method is a dict index plus an AND
+_F_IDLE, _F_ACTIVE, _F_RUNNING, _F_PAUSED, _F_TERMINAL, _F_CAN_CANCEL = (
+    1 << i for i in range(6))
+
+_STATE_FLAGS = {
+    GlobalState.IDLE: _F_IDLE,
+    GlobalState.PREPARING: _F_ACTIVE,
+    GlobalState.RUNNING: _F_ACTIVE | _F_RUNNING | _F_CAN_CANCEL,
+    GlobalState.PAUSED: _F_ACTIVE | _F_PAUSED | _F_CAN_CANCEL,
+    GlobalState.COMPLETED: _F_TERMINAL,
+    GlobalState.CANCELLING: _F_TERMINAL,
+    GlobalState.ERROR: _F_TERMINAL,
+}
+
+
+class GlobalStateMachine:
+    """Thread-safe lifecycle state machine.
+
+    Writers serialize through a mutex; readers use a seqlock-style
+    versioned snapshot instead. Every mutation bumps ``_seq`` to an odd
+    value while in flight and back to even when done, so a reader only
+    needs two counter loads and an equality check — no lock acquisition —
+    to know its read was consistent. Attribute loads are atomic under
+    CPython's GIL, which makes the version check sufficient. This matters
+    because the UI polls ``state`` and the predicates far more often than
+    anything ever transitions.
+    """
+
+    # No per-instance __dict__: attribute reads on the polling hot path
+    # become fixed-offset loads instead of dict lookups
+    __slots__ = ('_lock', '_seq', '_state', '_error_message', '_metadata',
+                 '_state_history', '_epoch_wall', '_epoch_ns', '_transition_ns',
+                 '_dict_cache')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._state = GlobalState.IDLE
+        self._error_message = None
+        self._metadata = {}
+        # Immutable snapshot, rebuilt per transition and trimmed to the
+        # last 100 entries. Transitions are rare and reads frequent, so
+        # paying O(n) on write buys copy-free reads: to_dict can hold the
+        # tuple reference directly instead of copying under the lock.
+        self._state_history = ()
+        # Timestamps are raw monotonic_ns ints — one clock read, no object
+        # construction. The wall-clock epoch captured here lets to_dict
+        # reconstruct ISO strings only when someone actually reads them.
+        self._epoch_wall = datetime.now()
+        self._epoch_ns = time.monotonic_ns()
+        self._transition_ns = self._epoch_ns
+        # (seq, dict) memo for to_dict; dropped on every transition
+        self._dict_cache = None
+
+    # ------------------------------------------------------------- lock-free reads
+
+    @property
+    def state(self) -> GlobalState:
+        while True:
+            s1 = self._seq
+            st = self._state
+            if s1 == self._seq and not (s1 & 1):
+                return st
+
+    @property
+    def error_message(self):
+        while True:
+            s1 = self._seq
+            msg = self._error_message
+            if s1 == self._seq and not (s1 & 1):
+                return msg
+
+    @property
+    def metadata(self):
+        # Writers publish whole replacement dicts (copy-on-write), so the
+        # reference read here is an atomic, internally consistent snapshot —
+        # no lock needed. The proxy is a zero-copy read-only view: no O(n)
+        # dict allocation per poll, and accidental mutation raises instead
+        # of silently diverging. Callers needing a mutable copy spell it
+        # out with dict(sm.metadata).
+        return MappingProxyType(self._metadata)
+
+    # ---------------------------------------------------------------- transitions
+
+    def _transition(self, new_state: GlobalState, metadata=None,
+                    error_message=None, clear_metadata=False):
+        with self._lock:
+            # The failure message only formats on the failure branch
+            if new_state not in _VALID_TRANSITIONS[self._state]:
+                raise StateTransitionError(
+                    f"Invalid transition: "
+                    f"{_STATE_VALUES[self._state]} → {_STATE_VALUES[new_state]}")
+            now_ns = time.monotonic_ns()
+            self._seq += 1
+            # Copy-on-write like the metadata dict: publish a fresh tuple
+            hist = self._state_history + (
+                _HistEntry(_STATE_VALUES[self._state], _STATE_VALUES[new_state],
+                           now_ns),)
+            self._state_history = hist if len(hist) <= 100 else hist[-100:]
+            self._state = new_state
+            # Copy-on-write: never mutate the published dict in place, so
+            # lock-free readers always see a complete version
+            if clear_metadata:
+                self._metadata = {}
+                self._error_message = None
+            else:
+                if metadata:
+                    self._metadata = {**self._metadata, **metadata}
+                if error_message is not None:
+                    self._error_message = error_message
+            self._transition_ns = now_ns
+            self._dict_cache = None
+            self._seq += 1
+
+    def start_generation(self, metadata=None):
+        self._transition(GlobalState.PREPARING, metadata)
+
+    def mark_ready(self):
+        self._transition(GlobalState.RUNNING)
+
+    def pause(self):
+        self._transition(GlobalState.PAUSED)
+
+    def resume(self):
+        self._transition(GlobalState.RUNNING)
+
+    def complete(self, metadata=None):
+        self._transition(GlobalState.COMPLETED, metadata)
+
+    def cancel(self):
+        self._transition(GlobalState.CANCELLING)
+
+    def error(self, error_message: str, metadata=None):
+        # One critical section: readers can never observe the ERROR state
+        # without its message (or vice versa)
+        self._transition(GlobalState.ERROR, metadata, error_message=error_message)
+
+    def reset(self):
+        self._transition(GlobalState.IDLE, clear_metadata=True)
+
+    # -------------------------------------------------------------------- queries
+
+    # Every predicate is one flag bit of the per-state mask in
+    # _STATE_FLAGS: a dict index plus an AND, no frozenset membership
+    # walk. They read _state with a single atomic load and skip the
+    # seqlock retry — each answer depends on one field only, so it is
+    # internally consistent by itself. Advisory only: worst case is a
+    # one-frame-stale button state, which the UI polling loop tolerates
+    # by design. Anything needing a reading consistent with metadata
+    # should go through `state`/`to_dict`.
+
+    def is_idle(self) -> bool:
+        return bool(_STATE_FLAGS[self._state] & _F_IDLE)
+
+    def is_active(self) -> bool:
+        return bool(_STATE_FLAGS[self._state] & _F_ACTIVE)
+
+    def is_running(self) -> bool:
+        return bool(_STATE_FLAGS[self._state] & _F_RUNNING)
+
+    def is_paused(self) -> bool:
+        return bool(_STATE_FLAGS[self._state] & _F_PAUSED)
+
+    def is_terminal(self) -> bool:
+        return bool(_STATE_FLAGS[self._state] & _F_TERMINAL)
+
+    def can_start(self) -> bool:
+        return bool(_STATE_FLAGS[self._state] & _F_IDLE)
+
+    def can_pause(self) -> bool:
+        return bool(_STATE_FLAGS[self._state] & _F_RUNNING)
+
+    def can_resume(self) -> bool:
+        return bool(_STATE_FLAGS[self._state] & _F_PAUSED)
+
+    def can_cancel(self) -> bool:
+        return bool(_STATE_FLAGS[self._state] & _F_CAN_CANCEL)
+
+    # -------------------------------------------------------------- serialization
+
+    def _iso(self, ns: int) -> str:
+        """Reconstruct a wall-clock ISO string from a stored monotonic read."""
+        return (self._epoch_wall
+                + timedelta(microseconds=(ns - self._epoch_ns) // 1000)).isoformat()
+
+    def to_dict(self) -> dict:
+        """Snapshot for the UI/persistence layer. Treat the result as
+        read-only: identical snapshots are memoized between transitions."""
+        # The seqlock counter doubles as a version number: if nothing has
+        # transitioned since the last call, the formatted dict (history ISO
+        # strings included) is still valid — skip rebuilding it. A stale
+        # miss under race just rebuilds once; correctness is unaffected.
+        cache = self._dict_cache
+        if cache is not None and cache[0] == self._seq:
+            return cache[1]
+        # Only grab references under the lock; copying and timestamp
+        # formatting happen afterwards so writers aren't blocked for the
+        # duration of the string work
+        with self._lock:
+            seq = self._seq
+            state_value = _STATE_VALUES[self._state]
+            err = self._error_message
+            meta = self._metadata
+            ts_ns = self._transition_ns
+            # The tuple is immutable — holding the reference is a snapshot
+            hist = self._state_history
+        result = {
+            "state": state_value,
+            "error_message": err,
+            "metadata": dict(meta),
+            "timestamp": self._iso(ts_ns),
+            "history": [{"from": e.from_state, "to": e.to_state,
+                         "timestamp": self._iso(e.timestamp_ns)}
+                        for e in hist[-10:]],
+        }
+        self._dict_cache = (seq, result)
+        return result
+
+    def __repr__(self):
+        return f"<GlobalStateMachine state={self.state.value}>"
+
+    def __str__(self):
+        text = f"State: {self.state.value}"
+        message = self.error_message
+        if message:
+            text += f" | Error: {message}"
+        return text
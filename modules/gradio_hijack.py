@@ -118,18 +118,21 @@ def update_multiple(updates: dict):
             "Developer Debug Mode": {"visible": True, "interactive": False},
         }
     """
+    # Resolución local + un solo comp.update con kwargs fusionados: un
+    # lookup de componente y una llamada por entrada, no hasta tres
+    gc_get = global_components.get
+    fn_get = friendly_names.get
     results = []
     for key, value in updates.items():
-        name = friendly_names.get(key, key)
+        comp = gc_get(fn_get(key, key))
+        if comp is None:
+            continue
         if isinstance(value, dict):
-            if 'value' in value:
-                results.append(set_value(name, value['value']))
-            if 'visible' in value:
-                results.append(set_visible(name, value['visible']))
-            if 'interactive' in value:
-                results.append(set_interactive(name, value['interactive']))
+            kwargs = {k: v for k, v in value.items()
+                      if k in ('value', 'visible', 'interactive')}
+            results.append(comp.update(**kwargs))
         else:
-            results.append(set_value(name, value))
+            results.append(comp.update(value=value))
     return results
 
 def list_components():
@@ -141,24 +144,22 @@ def hijack_all(gradio_root):
     Recorrer todos los componentes de Gradio y registrarlos automáticamente.
     Compatible con Tabs, Rows, Columns, Sliders, Checkboxes, Buttons, Images, Textboxes, etc.
     """
-    def recursive_register(components):
-        for comp in components:
-            # Registrar hijos si es contenedor
-            sub_comps = getattr(comp, 'children', None)
-            if sub_comps:
-                recursive_register(sub_comps)
-
-            # Obtener nombre real
-            name = getattr(comp, 'elem_id', None) or getattr(comp, 'label', None)
-            if name:
-                # Reemplazar por friendly name si existe
-                for friendly, real_name in friendly_names.items():
-                    if name == friendly:
-                        name = real_name
-                        break
-                register_component(name, comp)
-
-    recursive_register(gradio_root.components)
+    # Recorrido iterativo con pila explícita: un solo frame de Python para
+    # todo el árbol, sin riesgo de RecursionError en UIs profundas
+    stack = list(gradio_root.components)
+    while stack:
+        comp = stack.pop()
+        # Registrar hijos si es contenedor
+        sub_comps = getattr(comp, 'children', None)
+        if sub_comps:
+            stack.extend(sub_comps)
+
+        # Obtener nombre real
+        name = getattr(comp, 'elem_id', None) or getattr(comp, 'label', None)
+        if name:
+            # friendly_names ya mapea label -> nombre real: un lookup O(1)
+            # en vez de recorrer el dict entero por cada componente
+            register_component(friendly_names.get(name, name), comp)
 
 # =====================================
 # Uso típico:
@@ -0,0 +1,65 @@
+"""
+UX Rules for FooocArte
+Reglas de negocio que gobiernan qué puede hacer la UI según el estado del
+batch. Viven aquí (y no en los tests) para que la interfaz y la suite
+ejerciten exactamente el mismo código.
+"""
+
+from modules.batch_state_machine import EstadoBatch
+
+# One bit per state: each rule set collapses to a precomputed int mask,
+# so a predicate call is one dict lookup plus a bitwise AND
+_BIT = {estado: 1 << i for i, estado in enumerate(EstadoBatch)}
+
+
+class UXRules:
+    """Business logic rules for UI interactions.
+
+    Each rule is a class-level bitmask built once at import; predicates
+    AND the state's bit against it instead of walking an enum-equality
+    chain — these run on every UI poll tick.
+    """
+
+    _EDIT_CONFIG_MASK = _BIT[EstadoBatch.INACTIVO]
+    _PAUSE_MASK = _BIT[EstadoBatch.EJECUTANDO]
+    _RESUME_MASK = _BIT[EstadoBatch.EN_PAUSA]
+    _CANCEL_MASK = _BIT[EstadoBatch.EJECUTANDO] | _BIT[EstadoBatch.EN_PAUSA]
+    _START_MASK = (_BIT[EstadoBatch.INACTIVO] | _BIT[EstadoBatch.COMPLETADO]
+                   | _BIT[EstadoBatch.ERROR])
+    _PROGRESS_MASK = (_BIT[EstadoBatch.PREPARANDO] | _BIT[EstadoBatch.EJECUTANDO]
+                      | _BIT[EstadoBatch.EN_PAUSA] | _BIT[EstadoBatch.CANCELANDO])
+
+    @staticmethod
+    def puede_editar_config(estado: EstadoBatch) -> bool:
+        """Can edit batch configuration in this state?"""
+        return bool(UXRules._EDIT_CONFIG_MASK & _BIT[estado])
+
+    @staticmethod
+    def puede_pausar(estado: EstadoBatch) -> bool:
+        """Can pause batch in this state?"""
+        return bool(UXRules._PAUSE_MASK & _BIT[estado])
+
+    @staticmethod
+    def puede_reanudar(estado: EstadoBatch) -> bool:
+        """Can resume batch in this state?"""
+        return bool(UXRules._RESUME_MASK & _BIT[estado])
+
+    @staticmethod
+    def puede_cancelar(estado: EstadoBatch) -> bool:
+        """Can cancel batch in this state?"""
+        return bool(UXRules._CANCEL_MASK & _BIT[estado])
+
+    @staticmethod
+    def puede_iniciar_nuevo(estado: EstadoBatch) -> bool:
+        """Can start new batch in this state?"""
+        return bool(UXRules._START_MASK & _BIT[estado])
+
+    @staticmethod
+    def debe_mostrar_progreso(estado: EstadoBatch) -> bool:
+        """Should show progress bar in this state?"""
+        return bool(UXRules._PROGRESS_MASK & _BIT[estado])
+
+    @staticmethod
+    def debe_bloquear_inputs(estado: EstadoBatch) -> bool:
+        """Should lock input fields in this state?"""
+        return not (UXRules._START_MASK & _BIT[estado])
@@ -3,6 +3,11 @@ import re
 import shutil
 import subprocess
 
+# Patrones compilados una sola vez al importar
+APPROVED_RE = re.compile(r",\s*approved\s*=\s*[^,)]+")
+IOCOMPONENT_RE = re.compile(r"\bIOComponent\b")
+DEPRECATION_RE = re.compile(r"from gradio\.deprecation import .*")
+
 # ---------- 1️⃣ Actualizar dependencias ----------
 print("🔹 Actualizando Gradio y einops...")
 subprocess.run(["pip", "install", "--upgrade", "gradio==4.44.1"], check=True)
@@ -23,7 +28,7 @@ if os.path.exists(webui_path):
         content = f.read()
     
     # Elimina cualquier argumento 'approved=...'
-    fixed_content = re.sub(r",\s*approved\s*=\s*[^,)]+", "", content)
+    fixed_content = APPROVED_RE.sub("", content)
     
     with open(webui_path, "w", encoding="utf-8") as f:
         f.write(fixed_content)
@@ -37,10 +42,10 @@ if os.path.exists(grh_path):
         content = f.read()
     
     # 1️⃣ Reemplaza IOComponent por Component
-    content = re.sub(r"\bIOComponent\b", "Component", content)
-    
+    content = IOCOMPONENT_RE.sub("Component", content)
+
     # 2️⃣ Elimina imports de gradio.deprecation que ya no existen
-    content = re.sub(r"from gradio\.deprecation import .*", "", content)
+    content = DEPRECATION_RE.sub("", content)
     
     with open(grh_path, "w", encoding="utf-8") as f:
         f.write(content)
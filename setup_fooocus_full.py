@@ -1,3 +1,4 @@
+import mmap
 import os
 import re
 import shutil
@@ -6,6 +7,18 @@ import subprocess
 FOOOCUS_DIR = "./FooocArte"  # Cambia si tu carpeta principal es diferente
 REPO_URL = "https://github.com/lllyasviel/Fooocus"  # URL del repositorio oficial
 
+# Un solo patrón con alternación: una pasada sobre el archivo aplica los
+# tres arreglos, en vez de reconstruir el string completo por patrón
+COMBINED_RE = re.compile(
+    rb"(?P<approved>,\s*approved\s*=\s*[^,)]+)"
+    rb"|(?P<io>\bIOComponent\b)"
+    rb"|(?P<dep>from gradio\.deprecation import .*)")
+_REPLACEMENTS = {"approved": b"", "io": b"Component", "dep": b""}
+
+
+def _reemplazo(m):
+    return _REPLACEMENTS[m.lastgroup]
+
 # ---------- Funciones de utilidad ----------
 def run(cmd, cwd=None):
     print(f"💻 Ejecutando: {' '.join(cmd)}")
@@ -17,18 +30,26 @@ def backup_file(path):
         shutil.copy(path, backup_path)
         print(f"💾 Backup creado: {backup_path}")
 
-def patch_file(path, patterns_replacements):
-    if os.path.exists(path):
-        backup_file(path)
-        with open(path, "r", encoding="utf-8") as f:
-            content = f.read()
-        for pattern, repl in patterns_replacements:
-            content = re.sub(pattern, repl, content)
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(content)
-        print(f"✅ {path} parcheado")
-    else:
+def patch_file(path):
+    if not os.path.exists(path):
         print(f"⚠️ Archivo no encontrado: {path}")
+        return
+    # mmap para el escaneo: si no hay nada que arreglar no se copia el
+    # contenido a memoria ni se reescribe el archivo
+    with open(path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # archivo vacío
+            return
+        with data:
+            if COMBINED_RE.search(data) is None:
+                print(f"✅ {path} ya estaba parcheado")
+                return
+            content = COMBINED_RE.sub(_reemplazo, data[:])
+    backup_file(path)
+    with open(path, "wb") as f:
+        f.write(content)
+    print(f"✅ {path} parcheado")
 
 # ---------- 1️⃣ Clonar o actualizar repositorio ----------
 if not os.path.exists(FOOOCUS_DIR):
@@ -53,16 +74,11 @@ else:
 
 # ---------- 4️⃣ Parchear webui.py ----------
 webui_path = os.path.join(FOOOCUS_DIR, "webui.py")
-patch_file(webui_path, [
-    (r",\s*approved\s*=\s*[^,)]+", "")  # Elimina cualquier argumento approved=...
-])
+patch_file(webui_path)  # Elimina cualquier argumento approved=...
 
 # ---------- 5️⃣ Parchear gradio_hijack.py ----------
 grh_path = os.path.join(FOOOCUS_DIR, "modules/gradio_hijack.py")
-patch_file(grh_path, [
-    (r"\bIOComponent\b", "Component"),              # Reemplaza IOComponent por Component
-    (r"from gradio\.deprecation import .*", ""),    # Elimina imports obsoletos
-])
+patch_file(grh_path)  # IOComponent -> Component, imports obsoletos fuera
 
 # ---------- 6️⃣ Mensaje final ----------
 print("\n🎯 Configuración completa. Ahora puedes ejecutar Fooocus así:")
@@ -0,0 +1,84 @@
+"""
+Shared fixtures for the test suite.
+
+The state-machine fixtures live here so both state-machine test files
+(and any future ones) resolve them once per session instead of each file
+re-declaring its own copies. All of them are function-scoped: every test
+gets an isolated machine, which xdist distribution relies on.
+"""
+
+import pytest
+
+from modules.batch_state_machine import BatchStateMachine
+from modules.global_state_machine import GlobalStateMachine
+
+
+@pytest.fixture(autouse=True)
+def _cola_limpia():
+    """BatchQueue is a singleton: empty it between tests so state never leaks."""
+    try:
+        from modules.batch_queue import BatchQueue
+    except ImportError:
+        yield
+        return
+    BatchQueue().limpiar()
+    yield
+    BatchQueue().limpiar()
+
+
+# ------------------------------------------------------- BatchStateMachine
+
+@pytest.fixture
+def batch():
+    """Fresh state machine in INACTIVO."""
+    return BatchStateMachine()
+
+
+@pytest.fixture
+def started_batch(batch):
+    """Machine after iniciar(5): PREPARANDO."""
+    batch.iniciar(5)
+    return batch
+
+
+@pytest.fixture
+def running_batch(started_batch):
+    """Machine after iniciar(5) + preparado(): EJECUTANDO."""
+    started_batch.preparado()
+    return started_batch
+
+
+@pytest.fixture
+def paused_batch(running_batch):
+    """Machine after iniciar(5) + preparado() + pausar(): EN_PAUSA."""
+    running_batch.pausar()
+    return running_batch
+
+
+# ------------------------------------------------------ GlobalStateMachine
+
+@pytest.fixture
+def idle_sm():
+    """Fresh state machine in IDLE."""
+    return GlobalStateMachine()
+
+
+@pytest.fixture
+def preparing_sm(idle_sm):
+    """Machine after start_generation(): PREPARING."""
+    idle_sm.start_generation()
+    return idle_sm
+
+
+@pytest.fixture
+def running_sm(preparing_sm):
+    """Machine after start_generation() + mark_ready(): RUNNING."""
+    preparing_sm.mark_ready()
+    return preparing_sm
+
+
+@pytest.fixture
+def paused_sm(running_sm):
+    """Machine after start_generation() + mark_ready() + pause(): PAUSED."""
+    running_sm.pause()
+    return running_sm
@@ -123,10 +123,9 @@ class TestConcurrency:
         """Multiple operations should not corrupt queue"""
         cola = BatchQueue()
         
-        # Simulate rapid operations
-        for i in range(100):
-            cola.agregar(f"batch_{i}")
-        
+        # Bulk enqueue: one extend instead of 100 individual appends
+        cola.agregar_todos(f"batch_{i}" for i in range(100))
+
         assert cola.longitud() == 100
         
         # Retrieve all
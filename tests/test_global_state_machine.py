@@ -13,7 +13,7 @@ Tests:
 
 import pytest
 import threading
-import time
+from concurrent.futures import ThreadPoolExecutor
 from modules.global_state_machine import (
     GlobalStateMachine,
     GlobalState,
@@ -21,357 +21,309 @@ from modules.global_state_machine import (
 )
 
 
+# Every invalid-transition scenario as (setup sequence, illegal call,
+# expected message fragment): one parametrized test per case means all
+# failures surface at once under their own test id
+INVALID_CASES = [
+    ([], "mark_ready", "idle → running"),
+    (["start_generation"], "pause", "preparing → paused"),
+    (["start_generation", "mark_ready"], "start_generation", "running → preparing"),
+    (["start_generation", "mark_ready", "complete"], "mark_ready", "completed → running"),
+]
+_INVALID_IDS = ["idle_to_running", "preparing_to_paused",
+                "running_to_preparing", "completed_to_running"]
+
+# idle_sm/preparing_sm/running_sm/paused_sm fixtures come from conftest.py
+
+
+@pytest.fixture(scope="module")
+def fresh_sm():
+    """One pristine IDLE machine shared by the read-only tests.
+
+    Module-scoped: safe only for tests that never transition it."""
+    return GlobalStateMachine()
+
+
 class TestGlobalStateMachine:
     """Test suite for GlobalStateMachine"""
-    
-    def test_initial_state(self):
+
+    def test_initial_state(self, fresh_sm):
         """Test that state machine starts in IDLE"""
-        sm = GlobalStateMachine()
-        assert sm.state == GlobalState.IDLE
-        assert sm.is_idle()
-        assert not sm.is_active()
-        assert sm.can_start()
-    
-    def test_valid_transition_idle_to_preparing(self):
+        assert fresh_sm.state == GlobalState.IDLE
+        assert fresh_sm.is_idle()
+        assert not fresh_sm.is_active()
+        assert fresh_sm.can_start()
+
+    def test_valid_transition_idle_to_preparing(self, idle_sm):
         """Test IDLE → PREPARING transition"""
-        sm = GlobalStateMachine()
-        sm.start_generation({'prompt': 'test'})
-        assert sm.state == GlobalState.PREPARING
-        assert sm.metadata['prompt'] == 'test'
-    
-    def test_valid_transition_preparing_to_running(self):
+        idle_sm.start_generation({'prompt': 'test'})
+        assert idle_sm.state == GlobalState.PREPARING
+        assert idle_sm.metadata['prompt'] == 'test'
+
+    def test_valid_transition_preparing_to_running(self, preparing_sm):
         """Test PREPARING → RUNNING transition"""
-        sm = GlobalStateMachine()
-        sm.start_generation()
-        sm.mark_ready()
-        assert sm.state == GlobalState.RUNNING
-        assert sm.is_running()
-        assert sm.is_active()
-    
-    def test_valid_transition_running_to_paused(self):
+        preparing_sm.mark_ready()
+        assert preparing_sm.state == GlobalState.RUNNING
+        assert preparing_sm.is_running()
+        assert preparing_sm.is_active()
+
+    def test_valid_transition_running_to_paused(self, running_sm):
         """Test RUNNING → PAUSED transition"""
-        sm = GlobalStateMachine()
-        sm.start_generation()
-        sm.mark_ready()
-        sm.pause()
-        assert sm.state == GlobalState.PAUSED
-        assert sm.is_paused()
-        assert sm.can_resume()
-    
-    def test_valid_transition_paused_to_running(self):
+        running_sm.pause()
+        assert running_sm.state == GlobalState.PAUSED
+        assert running_sm.is_paused()
+        assert running_sm.can_resume()
+
+    def test_valid_transition_paused_to_running(self, paused_sm):
         """Test PAUSED → RUNNING transition"""
-        sm = GlobalStateMachine()
-        sm.start_generation()
-        sm.mark_ready()
-        sm.pause()
-        sm.resume()
-        assert sm.state == GlobalState.RUNNING
-        assert sm.is_running()
-    
-    def test_valid_transition_running_to_completed(self):
+        paused_sm.resume()
+        assert paused_sm.state == GlobalState.RUNNING
+        assert paused_sm.is_running()
+
+    def test_valid_transition_running_to_completed(self, running_sm):
         """Test RUNNING → COMPLETED transition"""
-        sm = GlobalStateMachine()
-        sm.start_generation()
-        sm.mark_ready()
-        sm.complete({'images': 5})
-        assert sm.state == GlobalState.COMPLETED
-        assert sm.is_terminal()
-        assert sm.metadata['images'] == 5
-    
-    def test_valid_transition_running_to_cancelling(self):
+        running_sm.complete({'images': 5})
+        assert running_sm.state == GlobalState.COMPLETED
+        assert running_sm.is_terminal()
+        assert running_sm.metadata['images'] == 5
+
+    def test_valid_transition_running_to_cancelling(self, running_sm):
         """Test RUNNING → CANCELLING transition"""
-        sm = GlobalStateMachine()
-        sm.start_generation()
-        sm.mark_ready()
-        sm.cancel()
-        assert sm.state == GlobalState.CANCELLING
-        assert sm.is_terminal()
-    
-    def test_valid_transition_paused_to_cancelling(self):
+        running_sm.cancel()
+        assert running_sm.state == GlobalState.CANCELLING
+        assert running_sm.is_terminal()
+
+    def test_valid_transition_paused_to_cancelling(self, paused_sm):
         """Test PAUSED → CANCELLING transition"""
-        sm = GlobalStateMachine()
-        sm.start_generation()
-        sm.mark_ready()
-        sm.pause()
-        sm.cancel()
-        assert sm.state == GlobalState.CANCELLING
-    
-    def test_valid_transition_preparing_to_error(self):
+        paused_sm.cancel()
+        assert paused_sm.state == GlobalState.CANCELLING
+
+    def test_valid_transition_preparing_to_error(self, preparing_sm):
         """Test PREPARING → ERROR transition"""
-        sm = GlobalStateMachine()
-        sm.start_generation()
-        sm.error("Model loading failed")
-        assert sm.state == GlobalState.ERROR
-        assert sm.error_message == "Model loading failed"
-        assert sm.is_terminal()
-    
-    def test_valid_transition_running_to_error(self):
+        preparing_sm.error("Model loading failed")
+        assert preparing_sm.state == GlobalState.ERROR
+        assert preparing_sm.error_message == "Model loading failed"
+        assert preparing_sm.is_terminal()
+
+    def test_valid_transition_running_to_error(self, running_sm):
         """Test RUNNING → ERROR transition"""
-        sm = GlobalStateMachine()
-        sm.start_generation()
-        sm.mark_ready()
-        sm.error("CUDA out of memory")
-        assert sm.state == GlobalState.ERROR
-        assert sm.error_message == "CUDA out of memory"
-    
-    def test_valid_transition_completed_to_idle(self):
+        running_sm.error("CUDA out of memory")
+        assert running_sm.state == GlobalState.ERROR
+        assert running_sm.error_message == "CUDA out of memory"
+
+    def test_valid_transition_completed_to_idle(self, running_sm):
         """Test COMPLETED → IDLE transition"""
-        sm = GlobalStateMachine()
-        sm.start_generation()
-        sm.mark_ready()
-        sm.complete()
-        sm.reset()
-        assert sm.state == GlobalState.IDLE
-        assert sm.can_start()
-        assert len(sm.metadata) == 0
-    
-    def test_valid_transition_error_to_idle(self):
+        running_sm.complete()
+        running_sm.reset()
+        assert running_sm.state == GlobalState.IDLE
+        assert running_sm.can_start()
+        assert len(running_sm.metadata) == 0
+
+    def test_valid_transition_error_to_idle(self, preparing_sm):
         """Test ERROR → IDLE transition"""
-        sm = GlobalStateMachine()
-        sm.start_generation()
-        sm.error("Test error")
-        sm.reset()
-        assert sm.state == GlobalState.IDLE
-        assert sm.error_message is None
-    
-    def test_valid_transition_cancelling_to_idle(self):
+        preparing_sm.error("Test error")
+        preparing_sm.reset()
+        assert preparing_sm.state == GlobalState.IDLE
+        assert preparing_sm.error_message is None
+
+    def test_valid_transition_cancelling_to_idle(self, running_sm):
         """Test CANCELLING → IDLE transition"""
-        sm = GlobalStateMachine()
-        sm.start_generation()
-        sm.mark_ready()
-        sm.cancel()
-        sm.reset()
-        assert sm.state == GlobalState.IDLE
-    
-    def test_invalid_transition_idle_to_running(self):
-        """Test invalid IDLE → RUNNING transition"""
-        sm = GlobalStateMachine()
+        running_sm.cancel()
+        running_sm.reset()
+        assert running_sm.state == GlobalState.IDLE
+
+    @pytest.mark.parametrize("setup,call,msg", INVALID_CASES, ids=_INVALID_IDS)
+    def test_invalid_transition(self, idle_sm, setup, call, msg):
+        """Invalid transitions raise StateTransitionError with the pair named"""
+        for step in setup:
+            getattr(idle_sm, step)()
+        # Plain substring check: match= would re-compile a regex per case
+        # for what is a static message
         with pytest.raises(StateTransitionError) as exc_info:
-            sm.mark_ready()
-        assert "Invalid transition" in str(exc_info.value)
-        assert "idle → running" in str(exc_info.value)
-    
-    def test_invalid_transition_preparing_to_paused(self):
-        """Test invalid PREPARING → PAUSED transition"""
-        sm = GlobalStateMachine()
-        sm.start_generation()
-        with pytest.raises(StateTransitionError):
-            sm.pause()
-    
-    def test_invalid_transition_running_to_preparing(self):
-        """Test invalid RUNNING → PREPARING transition"""
-        sm = GlobalStateMachine()
-        sm.start_generation()
-        sm.mark_ready()
-        with pytest.raises(StateTransitionError):
-            sm.start_generation()
-    
-    def test_invalid_transition_completed_to_running(self):
-        """Test invalid COMPLETED → RUNNING transition"""
-        sm = GlobalStateMachine()
-        sm.start_generation()
-        sm.mark_ready()
-        sm.complete()
-        with pytest.raises(StateTransitionError):
-            sm.mark_ready()
-    
-    def test_full_generation_lifecycle(self):
+            getattr(idle_sm, call)()
+        assert f"Invalid transition: {msg}" in str(exc_info.value)
+
+    def test_full_generation_lifecycle(self, idle_sm):
         """Test complete generation lifecycle"""
-        sm = GlobalStateMachine()
-        
+        sm = idle_sm
+
         # Start
         assert sm.can_start()
         sm.start_generation({'prompt': 'landscape'})
         assert sm.state == GlobalState.PREPARING
-        
+
         # Ready
         sm.mark_ready()
         assert sm.state == GlobalState.RUNNING
         assert sm.can_pause()
         assert sm.can_cancel()
-        
+
         # Complete
         sm.complete({'images': 10})
         assert sm.state == GlobalState.COMPLETED
-        
+
         # Reset
         sm.reset()
         assert sm.state == GlobalState.IDLE
         assert sm.can_start()
-    
-    def test_pause_resume_lifecycle(self):
+
+    def test_pause_resume_lifecycle(self, running_sm):
         """Test pause/resume lifecycle"""
-        sm = GlobalStateMachine()
-        sm.start_generation()
-        sm.mark_ready()
-        
         # Pause
-        sm.pause()
-        assert sm.is_paused()
-        assert not sm.can_pause()
-        assert sm.can_resume()
-        
+        running_sm.pause()
+        assert running_sm.is_paused()
+        assert not running_sm.can_pause()
+        assert running_sm.can_resume()
+
         # Resume
-        sm.resume()
-        assert sm.is_running()
-        assert sm.can_pause()
-        assert not sm.can_resume()
-    
-    def test_error_lifecycle(self):
+        running_sm.resume()
+        assert running_sm.is_running()
+        assert running_sm.can_pause()
+        assert not running_sm.can_resume()
+
+    def test_error_lifecycle(self, running_sm):
         """Test error handling lifecycle"""
-        sm = GlobalStateMachine()
-        sm.start_generation()
-        sm.mark_ready()
-        
         # Error
-        sm.error("Test error", {'code': 500})
-        assert sm.state == GlobalState.ERROR
-        assert sm.error_message == "Test error"
-        assert sm.metadata['code'] == 500
-        
+        running_sm.error("Test error", {'code': 500})
+        assert running_sm.state == GlobalState.ERROR
+        assert running_sm.error_message == "Test error"
+        assert running_sm.metadata['code'] == 500
+
         # Reset clears error
-        sm.reset()
-        assert sm.error_message is None
-        assert 'code' not in sm.metadata
-    
-    def test_thread_safety(self):
+        running_sm.reset()
+        assert running_sm.error_message is None
+        assert 'code' not in running_sm.metadata
+
+    @pytest.mark.slow
+    def test_thread_safety(self, running_sm):
         """Test thread-safe state access"""
-        sm = GlobalStateMachine()
-        sm.start_generation()
-        sm.mark_ready()
-        
+        sm = running_sm
+
         results = []
-        
+        # Pre-started workers all block on the event, then hammer the
+        # machine in one burst: maximum contention per unit time, no
+        # sleeps, and the lock on the accessors is the only rate-limiter
+        # — exactly the thing the test exercises
+        go = threading.Event()
+
         def read_state():
-            for _ in range(100):
-                state = sm.state
-                results.append(state)
-                time.sleep(0.001)
-        
+            go.wait()
+            for _ in range(50):
+                results.append(sm.state)
+
         def write_state():
+            go.wait()
             for _ in range(50):
                 if sm.can_pause():
                     sm.pause()
                 if sm.can_resume():
                     sm.resume()
-                time.sleep(0.002)
-        
-        threads = [
-            threading.Thread(target=read_state),
-            threading.Thread(target=read_state),
-            threading.Thread(target=write_state)
-        ]
-        
-        for t in threads:
-            t.start()
-        for t in threads:
-            t.join()
-        
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(read_state) for _ in range(3)]
+            futures.append(pool.submit(write_state))
+            go.set()
+            for f in futures:
+                f.result()
+
         # All reads should succeed
-        assert len(results) == 200
+        assert len(results) == 150
         # All states should be valid
         assert all(isinstance(s, GlobalState) for s in results)
-    
-    def test_serialization(self):
+
+    def test_serialization(self, idle_sm):
         """Test state serialization"""
-        sm = GlobalStateMachine()
-        sm.start_generation({'prompt': 'test', 'steps': 30})
-        sm.mark_ready()
-        
-        data = sm.to_dict()
-        
+        idle_sm.start_generation({'prompt': 'test', 'steps': 30})
+        idle_sm.mark_ready()
+
+        data = idle_sm.to_dict()
+
         assert data['state'] == 'running'
         assert data['metadata']['prompt'] == 'test'
         assert data['metadata']['steps'] == 30
         assert 'timestamp' in data
         assert 'history' in data
         assert len(data['history']) > 0
-    
-    def test_state_history(self):
+
+    def test_state_history(self, running_sm):
         """Test state transition history"""
-        sm = GlobalStateMachine()
-        sm.start_generation()
-        sm.mark_ready()
-        sm.pause()
-        sm.resume()
-        sm.complete()
-        
-        data = sm.to_dict()
+        running_sm.pause()
+        running_sm.resume()
+        running_sm.complete()
+
+        data = running_sm.to_dict()
         history = data['history']
-        
+
         # Should have recorded all transitions
         assert len(history) >= 5
         assert history[0]['from'] == 'idle'
         assert history[0]['to'] == 'preparing'
         assert history[-1]['to'] == 'completed'
-    
-    def test_query_methods(self):
-        """Test all query methods"""
-        sm = GlobalStateMachine()
-        
-        # IDLE
-        assert sm.is_idle()
-        assert not sm.is_active()
-        assert not sm.is_running()
-        assert not sm.is_paused()
-        assert not sm.is_terminal()
-        assert sm.can_start()
-        
-        # PREPARING
-        sm.start_generation()
+
+    def test_query_methods_idle(self, fresh_sm):
+        """Read-only idle predicates against the shared pristine machine"""
+        assert fresh_sm.is_idle()
+        assert not fresh_sm.is_active()
+        assert not fresh_sm.is_running()
+        assert not fresh_sm.is_paused()
+        assert not fresh_sm.is_terminal()
+        assert fresh_sm.can_start()
+
+    def test_query_methods_lifecycle(self, preparing_sm):
+        """Test query methods along the mutating lifecycle"""
+        sm = preparing_sm
         assert not sm.is_idle()
         assert sm.is_active()
         assert not sm.can_start()
-        
+
         # RUNNING
         sm.mark_ready()
         assert sm.is_running()
         assert sm.is_active()
         assert sm.can_pause()
         assert sm.can_cancel()
-        
+
         # PAUSED
         sm.pause()
         assert sm.is_paused()
         assert sm.is_active()
         assert sm.can_resume()
         assert sm.can_cancel()
-        
+
         # COMPLETED
         sm.resume()
         sm.complete()
         assert sm.is_terminal()
         assert not sm.is_active()
-    
-    def test_metadata_isolation(self):
+
+    def test_metadata_isolation(self, idle_sm):
         """Test that metadata is properly isolated"""
-        sm = GlobalStateMachine()
-        sm.start_generation({'key': 'value'})
-        
-        # Get metadata
-        meta1 = sm.metadata
-        meta1['key'] = 'modified'
-        
-        # Original should be unchanged
-        meta2 = sm.metadata
-        assert meta2['key'] == 'value'
-    
-    def test_repr_and_str(self):
-        """Test string representations"""
-        sm = GlobalStateMachine()
-        
-        repr_str = repr(sm)
+        idle_sm.start_generation({'key': 'value'})
+
+        # The view is read-only: mutation attempts fail loudly
+        with pytest.raises(TypeError):
+            idle_sm.metadata['key'] = 'modified'
+
+        # Original is unchanged; a mutable copy is an explicit dict()
+        assert idle_sm.metadata['key'] == 'value'
+        copia = dict(idle_sm.metadata)
+        copia['key'] = 'modified'
+        assert idle_sm.metadata['key'] == 'value'
+
+    def test_repr_and_str(self, fresh_sm):
+        """Test string representations (read-only)"""
+        repr_str = repr(fresh_sm)
         assert 'GlobalStateMachine' in repr_str
         assert 'idle' in repr_str
-        
-        str_str = str(sm)
+
+        str_str = str(fresh_sm)
         assert 'State:' in str_str
         assert 'idle' in str_str
-        
-        # With error
-        sm.start_generation()
-        sm.error("Test error")
-        str_str = str(sm)
+
+    def test_str_with_error(self, preparing_sm):
+        """Test string representation once an error is set"""
+        preparing_sm.error("Test error")
+        str_str = str(preparing_sm)
         assert 'Error:' in str_str
         assert 'Test error' in str_str
 
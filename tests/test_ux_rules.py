@@ -8,135 +8,84 @@ based on the current batch state.
 
 import pytest
 from modules.batch_state_machine import EstadoBatch
+from modules.ux_rules import UXRules
 
 
-class UXRules:
-    """Business logic rules for UI interactions"""
-    
-    @staticmethod
-    def puede_editar_config(estado: EstadoBatch) -> bool:
-        """Can edit batch configuration in this state?"""
-        return estado == EstadoBatch.INACTIVO
-    
-    @staticmethod
-    def puede_pausar(estado: EstadoBatch) -> bool:
-        """Can pause batch in this state?"""
-        return estado == EstadoBatch.EJECUTANDO
-    
-    @staticmethod
-    def puede_reanudar(estado: EstadoBatch) -> bool:
-        """Can resume batch in this state?"""
-        return estado == EstadoBatch.EN_PAUSA
-    
-    @staticmethod
-    def puede_cancelar(estado: EstadoBatch) -> bool:
-        """Can cancel batch in this state?"""
-        return estado in [EstadoBatch.EJECUTANDO, EstadoBatch.EN_PAUSA]
-    
-    @staticmethod
-    def puede_iniciar_nuevo(estado: EstadoBatch) -> bool:
-        """Can start new batch in this state?"""
-        return estado in [EstadoBatch.INACTIVO, EstadoBatch.COMPLETADO, EstadoBatch.ERROR]
-    
-    @staticmethod
-    def debe_mostrar_progreso(estado: EstadoBatch) -> bool:
-        """Should show progress bar in this state?"""
-        return estado in [EstadoBatch.PREPARANDO, EstadoBatch.EJECUTANDO, EstadoBatch.EN_PAUSA, EstadoBatch.CANCELANDO]
-    
-    @staticmethod
-    def debe_bloquear_inputs(estado: EstadoBatch) -> bool:
-        """Should lock input fields in this state?"""
-        return estado not in [EstadoBatch.INACTIVO, EstadoBatch.COMPLETADO, EstadoBatch.ERROR]
+# Exhaustive rule tables, one (estado, expected) pair per state. Each table
+# becomes one parametrized test per state: a failure names the exact state
+# that broke instead of aborting the whole exhaustive check at the first
+# bad assert.
+def _casos(estados_verdaderos):
+    return [(estado, estado in estados_verdaderos) for estado in EstadoBatch]
+
+
+_IDS = [estado.name for estado in EstadoBatch]
+
+CONFIG_CASES = _casos({EstadoBatch.INACTIVO})
+PAUSAR_CASES = _casos({EstadoBatch.EJECUTANDO})
+REANUDAR_CASES = _casos({EstadoBatch.EN_PAUSA})
+CANCELAR_CASES = _casos({EstadoBatch.EJECUTANDO, EstadoBatch.EN_PAUSA})
+INICIAR_NUEVO_CASES = _casos({EstadoBatch.INACTIVO, EstadoBatch.COMPLETADO,
+                              EstadoBatch.ERROR})
+PROGRESO_CASES = _casos({EstadoBatch.PREPARANDO, EstadoBatch.EJECUTANDO,
+                         EstadoBatch.EN_PAUSA, EstadoBatch.CANCELANDO})
+BLOQUEAR_CASES = _casos({EstadoBatch.PREPARANDO, EstadoBatch.EJECUTANDO,
+                         EstadoBatch.EN_PAUSA, EstadoBatch.CANCELANDO})
 
 
 class TestConfigurationRules:
     """Test configuration editing rules"""
-    
-    def test_editar_config_solo_inactivo(self):
+
+    @pytest.mark.parametrize("estado,expected", CONFIG_CASES, ids=_IDS)
+    def test_editar_config_solo_inactivo(self, estado, expected):
         """Configuration can only be edited when INACTIVO"""
-        assert UXRules.puede_editar_config(EstadoBatch.INACTIVO)
-        assert not UXRules.puede_editar_config(EstadoBatch.PREPARANDO)
-        assert not UXRules.puede_editar_config(EstadoBatch.EJECUTANDO)
-        assert not UXRules.puede_editar_config(EstadoBatch.EN_PAUSA)
-        assert not UXRules.puede_editar_config(EstadoBatch.CANCELANDO)
-        assert not UXRules.puede_editar_config(EstadoBatch.COMPLETADO)
-        assert not UXRules.puede_editar_config(EstadoBatch.ERROR)
+        assert UXRules.puede_editar_config(estado) is expected
 
 
 class TestPauseResumeRules:
     """Test pause/resume button visibility rules"""
-    
-    def test_pausar_solo_ejecutando(self):
+
+    @pytest.mark.parametrize("estado,expected", PAUSAR_CASES, ids=_IDS)
+    def test_pausar_solo_ejecutando(self, estado, expected):
         """Pause button only enabled when EJECUTANDO"""
-        assert UXRules.puede_pausar(EstadoBatch.EJECUTANDO)
-        assert not UXRules.puede_pausar(EstadoBatch.INACTIVO)
-        assert not UXRules.puede_pausar(EstadoBatch.PREPARANDO)
-        assert not UXRules.puede_pausar(EstadoBatch.EN_PAUSA)
-        assert not UXRules.puede_pausar(EstadoBatch.CANCELANDO)
-        assert not UXRules.puede_pausar(EstadoBatch.COMPLETADO)
-        assert not UXRules.puede_pausar(EstadoBatch.ERROR)
-    
-    def test_reanudar_solo_en_pausa(self):
+        assert UXRules.puede_pausar(estado) is expected
+
+    @pytest.mark.parametrize("estado,expected", REANUDAR_CASES, ids=_IDS)
+    def test_reanudar_solo_en_pausa(self, estado, expected):
         """Resume button only enabled when EN_PAUSA"""
-        assert UXRules.puede_reanudar(EstadoBatch.EN_PAUSA)
-        assert not UXRules.puede_reanudar(EstadoBatch.INACTIVO)
-        assert not UXRules.puede_reanudar(EstadoBatch.PREPARANDO)
-        assert not UXRules.puede_reanudar(EstadoBatch.EJECUTANDO)
-        assert not UXRules.puede_reanudar(EstadoBatch.CANCELANDO)
-        assert not UXRules.puede_reanudar(EstadoBatch.COMPLETADO)
-        assert not UXRules.puede_reanudar(EstadoBatch.ERROR)
+        assert UXRules.puede_reanudar(estado) is expected
 
 
 class TestCancellationRules:
     """Test cancellation rules"""
-    
-    def test_cancelar_solo_ejecutando_o_pausado(self):
+
+    @pytest.mark.parametrize("estado,expected", CANCELAR_CASES, ids=_IDS)
+    def test_cancelar_solo_ejecutando_o_pausado(self, estado, expected):
         """Can cancel when EJECUTANDO or EN_PAUSA"""
-        assert UXRules.puede_cancelar(EstadoBatch.EJECUTANDO)
-        assert UXRules.puede_cancelar(EstadoBatch.EN_PAUSA)
-        assert not UXRules.puede_cancelar(EstadoBatch.INACTIVO)
-        assert not UXRules.puede_cancelar(EstadoBatch.PREPARANDO)
-        assert not UXRules.puede_cancelar(EstadoBatch.CANCELANDO)
-        assert not UXRules.puede_cancelar(EstadoBatch.COMPLETADO)
-        assert not UXRules.puede_cancelar(EstadoBatch.ERROR)
+        assert UXRules.puede_cancelar(estado) is expected
 
 
 class TestBatchStartRules:
     """Test rules for starting new batches"""
-    
-    def test_iniciar_nuevo_solo_estados_finales(self):
+
+    @pytest.mark.parametrize("estado,expected", INICIAR_NUEVO_CASES, ids=_IDS)
+    def test_iniciar_nuevo_solo_estados_finales(self, estado, expected):
         """Can only start new batch from final states"""
-        assert UXRules.puede_iniciar_nuevo(EstadoBatch.INACTIVO)
-        assert UXRules.puede_iniciar_nuevo(EstadoBatch.COMPLETADO)
-        assert UXRules.puede_iniciar_nuevo(EstadoBatch.ERROR)
-        assert not UXRules.puede_iniciar_nuevo(EstadoBatch.PREPARANDO)
-        assert not UXRules.puede_iniciar_nuevo(EstadoBatch.EJECUTANDO)
-        assert not UXRules.puede_iniciar_nuevo(EstadoBatch.EN_PAUSA)
-        assert not UXRules.puede_iniciar_nuevo(EstadoBatch.CANCELANDO)
+        assert UXRules.puede_iniciar_nuevo(estado) is expected
 
 
 class TestUIVisibilityRules:
     """Test UI element visibility rules"""
-    
-    def test_mostrar_progreso_estados_activos(self):
+
+    @pytest.mark.parametrize("estado,expected", PROGRESO_CASES, ids=_IDS)
+    def test_mostrar_progreso_estados_activos(self, estado, expected):
         """Progress bar visible during active states"""
-        assert UXRules.debe_mostrar_progreso(EstadoBatch.PREPARANDO)
-        assert UXRules.debe_mostrar_progreso(EstadoBatch.EJECUTANDO)
-        assert UXRules.debe_mostrar_progreso(EstadoBatch.EN_PAUSA)
-        assert UXRules.debe_mostrar_progreso(EstadoBatch.CANCELANDO)
-        assert not UXRules.debe_mostrar_progreso(EstadoBatch.INACTIVO)
-        assert not UXRules.debe_mostrar_progreso(EstadoBatch.COMPLETADO)
-        assert not UXRules.debe_mostrar_progreso(EstadoBatch.ERROR)
-    
-    def test_bloquear_inputs_durante_procesamiento(self):
+        assert UXRules.debe_mostrar_progreso(estado) is expected
+
+    @pytest.mark.parametrize("estado,expected", BLOQUEAR_CASES, ids=_IDS)
+    def test_bloquear_inputs_durante_procesamiento(self, estado, expected):
         """Input fields locked during processing"""
-        assert UXRules.debe_bloquear_inputs(EstadoBatch.PREPARANDO)
-        assert UXRules.debe_bloquear_inputs(EstadoBatch.EJECUTANDO)
-        assert UXRules.debe_bloquear_inputs(EstadoBatch.EN_PAUSA)
-        assert UXRules.debe_bloquear_inputs(EstadoBatch.CANCELANDO)
-        assert not UXRules.debe_bloquear_inputs(EstadoBatch.INACTIVO)
-        assert not UXRules.debe_bloquear_inputs(EstadoBatch.COMPLETADO)
-        assert not UXRules.debe_bloquear_inputs(EstadoBatch.ERROR)
+        assert UXRules.debe_bloquear_inputs(estado) is expected
 
 
 class TestCombinedRules: